@@ -1,9 +1,15 @@
 import os
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel, Field
 from typing import List, Optional
+import threading
+from .cache import ResponseCache, LRUCacheTier, MongoCacheTier
+from .runtime import llm_semaphore
+from .prompt_packing import pack_inputs
 
 # --- Pydantic Models ---
 class ATSScore(BaseModel):
@@ -17,10 +23,53 @@ class AnalyzedContent(BaseModel):
     experience_level_update: Optional[str] = Field(description="If the input suggests an experience level (Junior, Mid, Senior), include it here.")
     feedback: str = Field(description="Brief feedback to the user on what was extracted")
 
+class FusedTurn(BaseModel):
+    section: str = Field(description="The resume section the user's input belongs to (education, skills, projects, experience, summary, etc.), or 'none' if there is no input")
+    content: List[str] = Field(description="The refined content points to add to the resume in professional tone (empty if there is no input)")
+    experience_level_update: Optional[str] = Field(description="If the input suggests an experience level (Junior, Mid, Senior), include it here.")
+    summary: Optional[str] = Field(description="A 3-4 sentence professional summary, only when requested")
+    ats_score: int = Field(description="ATS score out of 100 for the resume after this update")
+    ats_feedback: List[str] = Field(description="List of specific feedback points")
+    missing_keywords: List[str] = Field(description="List of keywords from job description missing in resume")
+    next_question: str = Field(description="The next ONE interview question to ask the user")
+
 # --- LLM Setup ---
 # Ensure GOOGLE_API_KEY is available in environment or handle it.
 # Assuming streamlint or docker compose env checks this.
-llm = ChatGoogleGenerativeAI(model="models/gemini-2.5-flash", temperature=0.7)
+LLM_MODEL = "models/gemini-2.5-flash"
+LLM_TEMPERATURE = 0.7
+llm = ChatGoogleGenerativeAI(model=LLM_MODEL, temperature=LLM_TEMPERATURE)
+
+# --- Response Cache ---
+# LLM_CACHE_SIZE sizes the in-process tier; LLM_CACHE_MONGO=true adds a tier shared by all replicas.
+def _build_response_cache():
+    tiers = [LRUCacheTier(maxsize=int(os.getenv("LLM_CACHE_SIZE", "256")))]
+    if os.getenv("LLM_CACHE_MONGO", "false").lower() == "true":
+        from core.database import db
+        tiers.append(MongoCacheTier(db.collection("llm_cache"), ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))))
+    return ResponseCache(tiers)
+
+response_cache = _build_response_cache()
+
+# Inputs are packed before keying the cache, so cosmetic differences (empty fields) still hit
+def _cached_invoke(name, chain, inputs, use_cache=True):
+    inputs = pack_inputs(name, inputs)
+    namespace = f"{name}:{LLM_MODEL}:{LLM_TEMPERATURE}"
+    return response_cache.get_or_compute(namespace, inputs, lambda: chain.invoke(inputs), use_cache=use_cache)
+
+async def _acached_invoke(name, chain, inputs, use_cache=True):
+    inputs = pack_inputs(name, inputs)
+    namespace = f"{name}:{LLM_MODEL}:{LLM_TEMPERATURE}"
+
+    async def acompute():
+        async with llm_semaphore():
+            return await chain.ainvoke(inputs)
+
+    return await response_cache.aget_or_compute(namespace, inputs, acompute, use_cache=use_cache)
+
+def get_cache_stats():
+    """Returns hit/miss/bypass counters per chain."""
+    return {name: dict(counters) for name, counters in response_cache.stats.items()}
 
 # --- Prompts ---
 ats_prompt = ChatPromptTemplate.from_template(
@@ -39,9 +88,12 @@ interview_prompt = ChatPromptTemplate.from_template(
 
     Job Description: {job_description}
     Current Resume Data: {resume_data}
-    Conversation History: {history}
+    Earlier Conversation (summary): {history_summary}
+    Recent Conversation: {history}
+    Sections Still Missing: {missing_sections}
 
     Ask the NEXT ONE relevant question to gather missing or detailed information for the resume (e.g., specific metrics for a project, details about a skill, missing education dates).
+    Prioritize the sections that are still missing, if any.
     Only ask ONE question at a time. Be encouraging and professional.
     """
 )
@@ -77,35 +129,190 @@ summary_prompt = ChatPromptTemplate.from_template(
     """
 )
 
+conversation_summary_prompt = ChatPromptTemplate.from_template(
+    """You maintain a running summary of a resume-building interview between a recruiter (AI) and a candidate (User).
+
+    Summary So Far: {history_summary}
+    New Turns: {history}
+
+    Update the summary with the new turns. Keep every fact the candidate shared (roles, projects, metrics, skills, dates) and note which topics have already been asked about.
+    Keep it under 150 words. Return ONLY the updated summary text.
+    """
+)
+
+fused_turn_prompt = ChatPromptTemplate.from_template(
+    """You are an expert technical recruiter, professional resume writer and ATS scanner building a resume tailored to the Job Description. Handle one chat turn in a single answer.
+
+    Job Description: {job_description}
+    Current Resume Data: {resume_data}
+    Earlier Conversation (summary): {history_summary}
+    Recent Conversation: {history}
+    Sections Still Missing: {missing_sections}
+    User Input: {user_input}
+
+    1. If there is User Input, identify its resume section and refine it into professional, impact-driven bullet points (or text for summary). Use action verbs and metrics where possible. Note the user's seniority level if mentioned.
+    2. Write Summary: {write_summary}. If yes, write a 3-4 sentence professional summary tailored to the Job Description from the resume data including this update; otherwise leave it empty.
+    3. Score the resume including this update against the Job Description out of 100, with feedback points and missing keywords.
+    4. Ask the NEXT ONE relevant question, prioritizing the sections that are still missing. Be encouraging and professional.
+    """
+)
+
+repair_prompt = ChatPromptTemplate.from_template(
+    """Your previous answer could not be validated against the required schema.
+
+    Previous Answer: {raw}
+    Validation Error: {error}
+
+    Return the same information, corrected so it matches the schema exactly.
+    """
+)
+
+# --- Structured Output ---
+# smart_content and ats use Gemini's native JSON-schema mode; a result that still fails
+# validation gets exactly one repair call before the chain raises.
+parse_stats = {}
+_parse_stats_lock = threading.Lock()
+
+def _count_parse(name, key):
+    with _parse_stats_lock:
+        stats = parse_stats.setdefault(name, {"calls": 0, "parse_failures": 0, "repaired": 0, "unrecovered": 0})
+        stats[key] += 1
+
+def _repair_inputs(output):
+    raw = output["raw"]
+    return {"raw": getattr(raw, "content", None) or str(raw), "error": str(output["parsing_error"])}
+
+def _accept_parsed(name, output):
+    """Returns the parsed result as a dict, or None when it needs a repair pass."""
+    _count_parse(name, "calls")
+    if output["parsed"] is not None:
+        return output["parsed"].model_dump()
+    _count_parse(name, "parse_failures")
+    return None
+
+def _accept_repaired(name, output):
+    if output["parsed"] is not None:
+        _count_parse(name, "repaired")
+        return output["parsed"].model_dump()
+    _count_parse(name, "unrecovered")
+    raise OutputParserException(f"{name} output failed validation after repair: {output['parsing_error']}")
+
+def _structured_validator(name, repair_chain):
+    def validate(output):
+        result = _accept_parsed(name, output)
+        if result is None:
+            result = _accept_repaired(name, repair_chain.invoke(_repair_inputs(output)))
+        return result
+
+    async def avalidate(output):
+        result = _accept_parsed(name, output)
+        if result is None:
+            result = _accept_repaired(name, await repair_chain.ainvoke(_repair_inputs(output)))
+        return result
+
+    return RunnableLambda(validate, afunc=avalidate)
+
+def _structured_chain(name, prompt, schema):
+    structured_llm = llm.with_structured_output(schema, include_raw=True)
+    return prompt | structured_llm | _structured_validator(name, repair_prompt | structured_llm)
+
+def get_parse_stats():
+    """Returns structured-output counters and the parse failure rate per chain."""
+    with _parse_stats_lock:
+        return {
+            name: {**stats, "failure_rate": round(stats["parse_failures"] / stats["calls"], 3) if stats["calls"] else 0.0}
+            for name, stats in parse_stats.items()
+        }
+
 # --- Chains ---
 interview_chain = interview_prompt | llm | StrOutputParser()
-smart_content_chain = smart_content_prompt | llm | JsonOutputParser(pydantic_object=AnalyzedContent)
-ats_chain = ats_prompt | llm | JsonOutputParser(pydantic_object=ATSScore)
+smart_content_chain = _structured_chain("smart_content", smart_content_prompt, AnalyzedContent)
+ats_chain = _structured_chain("ats", ats_prompt, ATSScore)
+fused_turn_chain = _structured_chain("fused_turn", fused_turn_prompt, FusedTurn)
 summary_chain = summary_prompt | llm | StrOutputParser()
+conversation_summary_chain = conversation_summary_prompt | llm | StrOutputParser()
 
-# --- Functions ---
-def get_interview_question(job_description, resume_data, history):
-    return interview_chain.invoke({
+# --- Chain Inputs ---
+# Shared by the sync and async functions below so the two can never drift apart
+def _interview_inputs(job_description, resume_data, history, missing_sections=None, history_summary=""):
+    return {
         "job_description": job_description,
         "resume_data": resume_data,
-        "history": history
-    })
+        "history": history,
+        "history_summary": history_summary or "None",
+        "missing_sections": ", ".join(missing_sections) if missing_sections else "None"
+    }
 
-def analyze_and_refine_text(user_input, job_description, resume_data):
-    return smart_content_chain.invoke({
+def _smart_content_inputs(user_input, job_description, resume_data):
+    return {
         "user_input": user_input,
         "job_description": job_description,
         "resume_data": resume_data
-    })
+    }
 
-def calculate_ats_score(job_description, resume_data):
-    return ats_chain.invoke({
+def _resume_inputs(job_description, resume_data):
+    """Inputs of the ats and summary chains."""
+    return {
         "job_description": job_description,
         "resume_data": resume_data
-    })
+    }
 
-def generate_resume_summary(job_description, resume_data):
-    return summary_chain.invoke({
-        "job_description": job_description,
-        "resume_data": resume_data
-    })
+def _fused_turn_inputs(user_input, job_description, resume_data, history, missing_sections=None, history_summary="", write_summary=False):
+    return {
+        **_interview_inputs(job_description, resume_data, history, missing_sections, history_summary),
+        "user_input": user_input or "None",
+        "write_summary": "yes" if write_summary else "no"
+    }
+
+def _conversation_summary_inputs(history_summary, turns):
+    return {
+        "history_summary": history_summary or "None",
+        "history": turns
+    }
+
+# --- Functions ---
+def get_interview_question(job_description, resume_data, history, missing_sections=None, history_summary="", use_cache=True):
+    inputs = _interview_inputs(job_description, resume_data, history, missing_sections, history_summary)
+    return _cached_invoke("interview", interview_chain, inputs, use_cache=use_cache)
+
+def analyze_and_refine_text(user_input, job_description, resume_data, use_cache=True):
+    inputs = _smart_content_inputs(user_input, job_description, resume_data)
+    return _cached_invoke("smart_content", smart_content_chain, inputs, use_cache=use_cache)
+
+def calculate_ats_score(job_description, resume_data, use_cache=True):
+    return _cached_invoke("ats", ats_chain, _resume_inputs(job_description, resume_data), use_cache=use_cache)
+
+def generate_resume_summary(job_description, resume_data, use_cache=True):
+    return _cached_invoke("summary", summary_chain, _resume_inputs(job_description, resume_data), use_cache=use_cache)
+
+def run_fused_turn(user_input, job_description, resume_data, history, missing_sections=None, history_summary="", write_summary=False, use_cache=True):
+    """One call covering extraction, the optional summary, the ATS scan and the next question."""
+    inputs = _fused_turn_inputs(user_input, job_description, resume_data, history, missing_sections, history_summary, write_summary)
+    return _cached_invoke("fused_turn", fused_turn_chain, inputs, use_cache=use_cache)
+
+def summarize_conversation(history_summary, turns, use_cache=True):
+    inputs = _conversation_summary_inputs(history_summary, turns)
+    return _cached_invoke("conversation_summary", conversation_summary_chain, inputs, use_cache=use_cache)
+
+# --- Async Functions ---
+async def aget_interview_question(job_description, resume_data, history, missing_sections=None, history_summary="", use_cache=True):
+    inputs = _interview_inputs(job_description, resume_data, history, missing_sections, history_summary)
+    return await _acached_invoke("interview", interview_chain, inputs, use_cache=use_cache)
+
+async def aanalyze_and_refine_text(user_input, job_description, resume_data, use_cache=True):
+    inputs = _smart_content_inputs(user_input, job_description, resume_data)
+    return await _acached_invoke("smart_content", smart_content_chain, inputs, use_cache=use_cache)
+
+async def acalculate_ats_score(job_description, resume_data, use_cache=True):
+    return await _acached_invoke("ats", ats_chain, _resume_inputs(job_description, resume_data), use_cache=use_cache)
+
+async def agenerate_resume_summary(job_description, resume_data, use_cache=True):
+    return await _acached_invoke("summary", summary_chain, _resume_inputs(job_description, resume_data), use_cache=use_cache)
+
+async def arun_fused_turn(user_input, job_description, resume_data, history, missing_sections=None, history_summary="", write_summary=False, use_cache=True):
+    inputs = _fused_turn_inputs(user_input, job_description, resume_data, history, missing_sections, history_summary, write_summary)
+    return await _acached_invoke("fused_turn", fused_turn_chain, inputs, use_cache=use_cache)
+
+async def asummarize_conversation(history_summary, turns, use_cache=True):
+    inputs = _conversation_summary_inputs(history_summary, turns)
+    return await _acached_invoke("conversation_summary", conversation_summary_chain, inputs, use_cache=use_cache)
@@ -0,0 +1,167 @@
+"""Deterministic local ATS scorer.
+
+The job description is tokenized once into a weighted keyword index (unigrams
+and bigrams, with common synonyms folded onto one canonical term). Scoring a
+resume against the index is a set lookup per keyword, so it runs in
+milliseconds and gives the same answer every time.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Words that carry no skill signal in a job description
+STOPWORDS = {
+    "a", "about", "across", "an", "and", "any", "are", "as", "at", "be", "been", "both", "but", "by",
+    "can", "do", "each", "etc", "for", "from", "has", "have", "how", "if", "in", "into", "is", "it",
+    "its", "like", "more", "most", "must", "new", "not", "of", "on", "or", "other", "our", "out",
+    "own", "per", "plus", "should", "so", "such", "than", "that", "the", "their", "them", "these",
+    "they", "this", "those", "through", "to", "up", "us", "using", "via", "was", "we", "well", "what",
+    "when", "where", "which", "while", "who", "will", "with", "within", "would", "you", "your",
+    # Job-posting filler
+    "ability", "able", "candidate", "company", "excellent", "experience", "good", "great", "help",
+    "ideal", "including", "join", "knowledge", "looking", "preferred", "required", "requirements",
+    "responsibilities", "role", "skills", "strong", "team", "understanding", "work", "working",
+    "year", "years",
+}
+
+# Variant spellings folded onto one canonical term
+SYNONYMS = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "reactjs": "react",
+    "react.js": "react",
+    "node": "nodejs",
+    "node.js": "nodejs",
+    "vue.js": "vue",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "gcp": "google cloud",
+    "ci/cd": "cicd",
+    "llms": "llm",
+    "apis": "api",
+    "microservice": "microservices",
+}
+
+# Keys of resume_data that never contain matchable content
+IGNORED_SECTIONS = {"contact"}
+
+# Sections whose absence is reported as feedback
+EXPECTED_SECTIONS = {
+    "summary": "Add a professional summary tailored to the role.",
+    "skills": "Add a skills section listing the tools named in the job description.",
+    "education": "Add your education details.",
+}
+
+MAX_KEYWORDS = 40
+KEYWORD_WEIGHT = 0.85  # remainder of the score comes from section coverage
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./]*")
+
+
+def tokenize(text):
+    """Lower-cases and splits text into canonical tokens (synonyms folded, stopwords kept)."""
+    tokens = []
+    for raw in TOKEN_RE.findall(text.lower()):
+        token = raw.rstrip("./")
+        if not token:
+            continue
+        tokens.append(SYNONYMS.get(token, token))
+    return tokens
+
+
+def extract_terms(text):
+    """Returns a Counter of unigram and bigram terms, ignoring stopwords and bare numbers."""
+    terms = Counter()
+    previous = None
+    for token in tokenize(text):
+        if token in STOPWORDS or token.isdigit() or (len(token) < 2 and token not in ("c", "r")):
+            previous = None
+            continue
+        terms[token] += 1
+        if " " in token:
+            # A folded abbreviation ("ml") also counts as the words it stands for
+            terms.update(token.split())
+        if previous:
+            bigram = f"{previous} {token}"
+            terms[SYNONYMS.get(bigram, bigram)] += 1
+        previous = token
+    return terms
+
+
+class KeywordIndex:
+    """Weighted keywords of one job description."""
+
+    def __init__(self, job_description, max_keywords=MAX_KEYWORDS):
+        terms = extract_terms(job_description)
+        # Bigrams only count when they repeat; single mentions are usually incidental phrasing
+        candidates = [(t, c) for t, c in terms.items() if " " not in t or c > 1]
+        # Most frequent first; Counter preserves first-seen order among ties
+        candidates.sort(key=lambda item: -item[1])
+        self.weights = dict(candidates[:max_keywords])
+        self.total_weight = sum(self.weights.values())
+
+
+@lru_cache(maxsize=128)
+def build_keyword_index(job_description):
+    """Returns the (memoized) keyword index for a job description."""
+    return KeywordIndex(job_description)
+
+
+def _iter_text(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _iter_text(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_text(item)
+
+
+def resume_terms(resume_data):
+    """Returns the set of terms present anywhere in the resume content."""
+    text = "\n".join(
+        chunk
+        for section, value in resume_data.items()
+        if section not in IGNORED_SECTIONS
+        for chunk in _iter_text(value)
+    )
+    return set(extract_terms(text))
+
+
+def score_resume(job_description, resume_data):
+    """Scores resume_data against the job description.
+
+    Returns a dict shaped like the LLM `ATSScore`: score, feedback, missing_keywords.
+    """
+    index = build_keyword_index(job_description)
+    present = resume_terms(resume_data)
+
+    if index.total_weight:
+        matched = sum(w for term, w in index.weights.items() if term in present)
+        keyword_coverage = matched / index.total_weight
+    else:
+        keyword_coverage = 1.0
+
+    has_experience = bool(resume_data.get("experience") or resume_data.get("projects"))
+    sections_present = [bool(resume_data.get(s)) for s in EXPECTED_SECTIONS] + [has_experience]
+    section_coverage = sum(sections_present) / len(sections_present)
+
+    score = round(100 * (KEYWORD_WEIGHT * keyword_coverage + (1 - KEYWORD_WEIGHT) * section_coverage))
+
+    missing_keywords = [term for term in index.weights if term not in present]
+    feedback = [tip for section, tip in EXPECTED_SECTIONS.items() if not resume_data.get(section)]
+    if not has_experience:
+        feedback.append("Add work experience or projects with measurable results.")
+    if missing_keywords:
+        feedback.append(f"Work these job description keywords into your resume: {', '.join(missing_keywords[:8])}.")
+
+    return {"score": score, "feedback": feedback, "missing_keywords": missing_keywords}
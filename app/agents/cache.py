@@ -0,0 +1,132 @@
+"""Response cache for the LLM chains.
+
+Responses are keyed on a canonical hash of the chain name, model settings and
+prompt inputs. Lookups go through an in-process LRU tier first and, when
+configured, a MongoDB tier shared by every replica (expired by a TTL index).
+"""
+
+import asyncio
+import copy
+import threading
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import PyMongoError
+
+from core.hashing import canonical_hash
+from core.lru import LRUCache
+
+
+class LRUCacheTier(LRUCache):
+    """Thread-safe in-process LRU tier."""
+
+
+class MongoCacheTier:
+    """Shared tier stored in a MongoDB collection with a TTL index on `expires_at`."""
+
+    def __init__(self, collection, ttl_seconds=86400):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._index_ready = False
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+
+    def get(self, key):
+        try:
+            doc = self.collection.find_one({"_id": key}, {"value": 1, "expires_at": 1})
+        except PyMongoError as e:
+            print(f"LLM cache read failed: {e}")
+            return None
+        if not doc:
+            return None
+        # The TTL monitor only runs once a minute, so check expiry ourselves too
+        expires_at = doc.get("expires_at")
+        if expires_at and expires_at.replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc):
+            return None
+        return doc.get("value")
+
+    def set(self, key, value):
+        try:
+            self._ensure_index()
+            self.collection.replace_one(
+                {"_id": key},
+                {"value": value, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)},
+                upsert=True
+            )
+        except PyMongoError as e:
+            print(f"LLM cache write failed: {e}")
+
+
+class ResponseCache:
+    """Looks up responses tier by tier and back-fills faster tiers on a hit."""
+
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def make_key(self, namespace, inputs):
+        return canonical_hash(namespace, inputs)
+
+    def _count(self, namespace, field):
+        with self._lock:
+            counters = self.stats.setdefault(namespace, {"hits": 0, "misses": 0, "bypassed": 0})
+            counters[field] += 1
+
+    def get(self, key):
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key, value):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def get_or_compute(self, namespace, inputs, compute, use_cache=True):
+        """Returns the cached response for `inputs`, calling `compute()` on a miss."""
+        if not use_cache:
+            self._count(namespace, "bypassed")
+            return compute()
+
+        key = self.make_key(namespace, inputs)
+        value = self.get(key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return copy.deepcopy(value)
+
+        self._count(namespace, "misses")
+        value = compute()
+        if value is not None:
+            self.set(key, copy.deepcopy(value))
+        return value
+
+    async def aget_or_compute(self, namespace, inputs, acompute, use_cache=True):
+        """Async counterpart of get_or_compute; tier I/O runs off the event loop."""
+        if not use_cache:
+            self._count(namespace, "bypassed")
+            return await acompute()
+
+        key = self.make_key(namespace, inputs)
+        value = await asyncio.to_thread(self.get, key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return copy.deepcopy(value)
+
+        self._count(namespace, "misses")
+        value = await acompute()
+        if value is not None:
+            await asyncio.to_thread(self.set, key, copy.deepcopy(value))
+        return value
+
+    def clear(self):
+        for tier in self.tiers:
+            if isinstance(tier, LRUCacheTier):
+                tier.clear()
+        with self._lock:
+            self.stats.clear()
@@ -0,0 +1,176 @@
+"""MongoDB checkpointer for the agent graph.
+
+Each thread (a resume session) is one document holding only its latest
+checkpoint: every channel value serialized with LangGraph's msgpack serde, and
+the pending writes of the current step. A step $sets just the channels whose
+version moved, and put_writes $sets one field per write, so writes stay
+incremental. Resuming a session is a single find_one on `_id`, and any replica
+can serve any session.
+
+Only the latest checkpoint is kept, so there is no time travel; earlier
+checkpoint ids resolve to None.
+"""
+
+import asyncio
+import threading
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+
+def _doc_id(thread_id, checkpoint_ns):
+    return f"{thread_id}|{checkpoint_ns}"
+
+
+class MongoSaver(BaseCheckpointSaver):
+    """Latest-checkpoint-per-thread saver over one MongoDB collection."""
+
+    def __init__(self, collection, *, serde=None):
+        super().__init__(serde=serde)
+        self.collection = collection
+
+    def _dump(self, value):
+        kind, data = self.serde.dumps_typed(value)
+        return {"t": kind, "v": data}
+
+    def _load(self, stored):
+        return self.serde.loads_typed((stored["t"], bytes(stored["v"])))
+
+    def _to_tuple(self, doc):
+        thread_id, checkpoint_ns = doc["thread_id"], doc["checkpoint_ns"]
+        checkpoint = self._load(doc["checkpoint"])
+        checkpoint["channel_values"] = {k: self._load(v) for k, v in (doc.get("values") or {}).items()}
+        writes = sorted(
+            (w for by_task in (doc.get("writes") or {}).values() for w in by_task.values()),
+            key=lambda w: writes_sort_key(w["task_path"], w["task_id"], w["idx"])
+        )
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": doc["checkpoint_id"]
+            }},
+            checkpoint=checkpoint,
+            metadata=self._load(doc["metadata"]),
+            pending_writes=[(w["task_id"], w["channel"], self._load(w["value"])) for w in writes],
+            parent_config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id
+            }} if parent_id else None,
+        )
+
+    def get_tuple(self, config):
+        configurable = config["configurable"]
+        doc = self.collection.find_one({"_id": _doc_id(configurable["thread_id"], configurable.get("checkpoint_ns", ""))})
+        if not doc:
+            return None
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id and checkpoint_id != doc["checkpoint_id"]:
+            return None
+        return self._to_tuple(doc)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        query = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if "checkpoint_ns" in config["configurable"]:
+                query["checkpoint_ns"] = config["configurable"]["checkpoint_ns"]
+        if before and get_checkpoint_id(before):
+            query["checkpoint_id"] = {"$lt": get_checkpoint_id(before)}
+        count = 0
+        for doc in self.collection.find(query):
+            item = self._to_tuple(doc)
+            if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            yield item
+            count += 1
+            if limit and count >= limit:
+                return
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        configurable = config["configurable"]
+        thread_id, checkpoint_ns = configurable["thread_id"], configurable.get("checkpoint_ns", "")
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+
+        update = {"$set": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+            "parent_checkpoint_id": configurable.get("checkpoint_id"),
+            "checkpoint": self._dump(checkpoint),
+            "metadata": self._dump(get_checkpoint_metadata(config, metadata)),
+            # Pending writes belong to the previous checkpoint
+            "writes": {},
+        }}
+        # Only channels updated in this step are rewritten
+        for channel in new_versions:
+            if channel in values:
+                update["$set"][f"values.{channel}"] = self._dump(values[channel])
+            else:
+                update.setdefault("$unset", {})[f"values.{channel}"] = ""
+        self.collection.update_one({"_id": _doc_id(thread_id, checkpoint_ns)}, update, upsert=True)
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        configurable = config["configurable"]
+        fields = {}
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            fields[f"writes.{task_id}.{idx}"] = {
+                "task_id": task_id,
+                "task_path": task_path,
+                "idx": idx,
+                "channel": channel,
+                "value": self._dump(value),
+            }
+        if not fields:
+            return
+        self.collection.update_one(
+            {
+                "_id": _doc_id(configurable["thread_id"], configurable.get("checkpoint_ns", "")),
+                "checkpoint_id": configurable["checkpoint_id"],
+            },
+            {"$set": fields}
+        )
+
+    def delete_thread(self, thread_id):
+        self.collection.delete_many({"thread_id": thread_id})
+
+    # pymongo is synchronous, so the async API runs it on a worker thread
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """Returns the shared saver over the `graph_checkpoints` collection."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            from core.database import db
+            _checkpointer = MongoSaver(db.collection("graph_checkpoints"))
+        return _checkpointer
@@ -1,17 +1,95 @@
 from typing import TypedDict, List, Annotated
-from langgraph.graph import StateGraph, END
-from .agents import get_interview_question, analyze_and_refine_text, calculate_ats_score, generate_resume_summary
+from langgraph.graph import StateGraph, START, END
+from .agents import get_interview_question, analyze_and_refine_text, calculate_ats_score
+from .agents import aget_interview_question, aanalyze_and_refine_text, acalculate_ats_score
+from .agents import run_fused_turn, arun_fused_turn
+from .ats_local import score_resume
+from core.hashing import canonical_hash
+from services.completeness import evaluate_completeness, completeness_for_state
+import functools
 import operator
+import os
+import time
+
+# Run the LLM scan only after this many material resume changes (1 = every change)
+ATS_RESCORE_EVERY = max(1, int(os.getenv("ATS_RESCORE_EVERY", "1")))
+
+# The LLM scan runs automatically once the local keyword score reaches this value
+ATS_LLM_THRESHOLD = int(os.getenv("ATS_LLM_THRESHOLD", "70"))
+
+# Keys that do not affect the ATS score; raw_notes only grows when extraction failed
+ATS_IGNORED_KEYS = {"raw_notes"}
+
+# The interviewer sees the last HISTORY_WINDOW turns verbatim; older turns are folded into a
+# rolling summary, HISTORY_SUMMARY_BATCH at a time, off the turn (see .history_summary)
+HISTORY_WINDOW = max(2, int(os.getenv("HISTORY_WINDOW", "8")))
+HISTORY_SUMMARY_BATCH = max(1, int(os.getenv("HISTORY_SUMMARY_BATCH", "6")))
+
+# "graph" runs extraction, ATS scan and interviewer as separate LLM calls;
+# "fused" asks for all of them in one structured call per turn
+TURN_MODE = os.getenv("AGENT_TURN_MODE", "graph").lower()
+
+def merge_dicts(left: dict, right: dict) -> dict:
+    """Reducer so parallel branches can each report into the same dict channel."""
+    return {**(left or {}), **(right or {})}
 
 class AgentState(TypedDict):
     job_description: str
     resume_data: dict
-    history: List[str]
+    history: Annotated[List[str], operator.add]
     current_question: str
     user_last_response: str
     ats_score: int
     ats_feedback: List[str]
     next_step: str
+    node_timings: Annotated[dict, merge_dicts]
+    ats_missing_keywords: List[str]
+    ats_source: str
+    ats_llm_requested: bool
+    ats_fingerprint: str
+    ats_pending_changes: int
+    resume_version: int
+    completeness: dict
+    history_summary: str
+    summarized_turns: int
+
+def timed(name, node):
+    """Wraps a node so it reports its wall-clock latency (in seconds) under `node_timings`."""
+    @functools.wraps(node)
+    def wrapper(state):
+        start = time.perf_counter()
+        update = node(state) or {}
+        return {**update, "node_timings": {name: round(time.perf_counter() - start, 3)}}
+    return wrapper
+
+def atimed(name, node):
+    """Async counterpart of `timed`."""
+    @functools.wraps(node)
+    async def wrapper(state):
+        start = time.perf_counter()
+        update = await node(state) or {}
+        return {**update, "node_timings": {name: round(time.perf_counter() - start, 3)}}
+    return wrapper
+
+def recent_history(state: AgentState):
+    """Turns not yet folded into the rolling summary (normally at most HISTORY_WINDOW + HISTORY_SUMMARY_BATCH + 1)."""
+    return state.get("history", [])[state.get("summarized_turns", 0):]
+
+def interview_inputs(state: AgentState):
+    """Arguments for get_interview_question / aget_interview_question, and the completeness
+    report they were built from."""
+    completeness = completeness_for_state(state)
+    inputs = dict(
+        job_description=state["job_description"],
+        resume_data=state.get("resume_data", {}),
+        history=recent_history(state),
+        missing_sections=completeness["missing_sections"],
+        history_summary=state.get("history_summary", "")
+    )
+    return inputs, completeness
+
+def interview_update(question, completeness):
+    return {"current_question": question, "history": [f"AI: {question}"], "completeness": completeness}
 
 def interview_node(state: AgentState):
     # If there is a user response, we might want to process it (e.g., extract data)
@@ -19,13 +97,81 @@ def interview_node(state: AgentState):
     # but in a real app, we would have an extractor agent here.
     
     # Generate the next question
-    question = get_interview_question(
-        state["job_description"], 
-        state.get("resume_data", {}), 
-        state.get("history", [])
-    )
+    inputs, completeness = interview_inputs(state)
+    return interview_update(get_interview_question(**inputs), completeness)
+
+async def ainterview_node(state: AgentState):
+    inputs, completeness = interview_inputs(state)
+    return interview_update(await aget_interview_question(**inputs), completeness)
+
+def apply_analysis(resume_data, analysis):
+    """Merges the smart content agent's analysis into resume_data (in place)."""
+    # Update Resume Data based on section
+    section = analysis.get("section", "other")
+    content = analysis.get("content", [])
+    
+    if section not in resume_data:
+        # Initialize if it's a list-based section
+        if section in ["education", "skills", "projects", "experience", "raw_notes"]:
+            resume_data[section] = []
+        else:
+            resume_data[section] = "" # fallback
+        
+    # Append logic
+    if isinstance(resume_data[section], list):
+        resume_data[section].extend(content)
+    elif isinstance(resume_data[section], str):
+        # For singlular fields like summary, we might append or replace. 
+        # Let's append with newline
+        if resume_data[section]:
+             resume_data[section] += "\n" + "\n".join(content)
+        else:
+             resume_data[section] = "\n".join(content)
     
-    return {"current_question": question, "history": [f"AI: {question}"]}
+    # Update Experience Level if detected
+    exp_level = analysis.get("experience_level_update")
+    if exp_level:
+        resume_data["experience_level"] = exp_level
+
+def record_raw_note(resume_data, user_response):
+    """Fallback when the AI fails: keep the user's words as a raw note."""
+    if "raw_notes" not in resume_data:
+        resume_data["raw_notes"] = []
+    resume_data["raw_notes"].append(user_response)
+
+def needs_summary(resume_data):
+    """If summary is missing, and we have enough data (experience/projects AND skills), generate it."""
+    if resume_data.get("summary"):
+        return False
+    has_experience = bool(resume_data.get("experience") or resume_data.get("projects"))
+    has_skills = bool(resume_data.get("skills"))
+    return has_experience and has_skills
+
+def processing_update(state: AgentState, analysis):
+    """Builds the state update for the user's last response; `analysis` is None when the
+    smart content agent failed."""
+    user_response = state["user_last_response"]
+    resume_data = state.get("resume_data", {})
+
+    if analysis is not None:
+        try:
+            apply_analysis(resume_data, analysis)
+        except Exception as e:
+            print(f"Error in smart agent: {e}")
+            analysis = None
+    if analysis is None:
+        # Fallback if AI fails
+        record_raw_note(resume_data, user_response)
+
+    # The professional summary is generated off the turn, see .summary_queue
+
+    version = state.get("resume_version", 0) + 1
+    return {
+        "resume_data": resume_data, 
+        "history": [f"User: {user_response}"],
+        "resume_version": version,
+        "completeness": evaluate_completeness(resume_data, version)
+    }
 
 def processing_node(state: AgentState):
     # Process user's last response
@@ -33,94 +179,311 @@ def processing_node(state: AgentState):
     if not user_response:
         # If no user response, maybe this is the start or we just move on
         return {}
-        
-    resume_data = state.get("resume_data", {})
-    job_desc = state.get("job_description", "")
-    
+
     # Analyze and Refine
     try:
-        analysis = analyze_and_refine_text(user_response, job_desc, resume_data)
-        
-        # Update Resume Data based on section
-        section = analysis.get("section", "other")
-        content = analysis.get("content", [])
-        
-        if section not in resume_data:
-            # Initialize if it's a list-based section
-            if section in ["education", "skills", "projects", "experience", "raw_notes"]:
-                resume_data[section] = []
-            else:
-                resume_data[section] = "" # fallback
-            
-        # Append logic
-        if isinstance(resume_data[section], list):
-            resume_data[section].extend(content)
-        elif isinstance(resume_data[section], str):
-            # For singlular fields like summary, we might append or replace. 
-            # Let's append with newline
-            if resume_data[section]:
-                 resume_data[section] += "\n" + "\n".join(content)
-            else:
-                 resume_data[section] = "\n".join(content)
-        
-        # Update Experience Level if detected
-        exp_level = analysis.get("experience_level_update")
-        if exp_level:
-            resume_data["experience_level"] = exp_level
-            
+        analysis = analyze_and_refine_text(user_response, state.get("job_description", ""), state.get("resume_data", {}))
     except Exception as e:
-        # Fallback if AI fails
         print(f"Error in smart agent: {e}")
-        if "raw_notes" not in resume_data:
-            resume_data["raw_notes"] = []
-        resume_data["raw_notes"].append(user_response)
-    
-    # --- Auto-Generate Summary Check ---
-    # If summary is missing, and we have enough data (experience/projects AND skills), generate it.
-    if not resume_data.get("summary"):
-        # Check for sufficient data
-        has_experience = bool(resume_data.get("experience") or resume_data.get("projects"))
-        has_skills = bool(resume_data.get("skills"))
-        
-        if has_experience and has_skills:
-            try:
-                print("Generating auto-summary...")
-                summary = generate_resume_summary(job_desc, resume_data)
-                resume_data["summary"] = summary
-            except Exception as e:
-                print(f"Error generating summary: {e}")
+        analysis = None
+    return processing_update(state, analysis)
 
-    return {
-        "resume_data": resume_data, 
-        "history": [f"User: {user_response}"]
-    }
+async def aprocessing_node(state: AgentState):
+    user_response = state.get("user_last_response", "")
+    if not user_response:
+        return {}
 
-def ats_node(state: AgentState):
+    try:
+        analysis = await aanalyze_and_refine_text(user_response, state.get("job_description", ""), state.get("resume_data", {}))
+    except Exception as e:
+        print(f"Error in smart agent: {e}")
+        analysis = None
+    return processing_update(state, analysis)
+
+def plan_history_summary(state: AgentState):
+    """Returns (turns_to_fold, new_summarized_turns) once a full batch has aged out of the
+    window, else None."""
+    history = state.get("history", [])
+    summarized = state.get("summarized_turns", 0)
+    if len(history) - summarized < HISTORY_WINDOW + HISTORY_SUMMARY_BATCH:
+        return None
+    cutoff = len(history) - HISTORY_WINDOW
+    return history[summarized:cutoff], cutoff
+
+def ats_fingerprint(job_description, resume_data):
+    """Hash of everything that can change the ATS score."""
+    scored = {k: v for k, v in resume_data.items() if k not in ATS_IGNORED_KEYS}
+    return canonical_hash(job_description, scored)
+
+def plan_ats_scan(state: AgentState):
+    """Scores locally and decides whether the LLM scan is needed.
+
+    Returns (update, run_llm); when run_llm is False the update is final.
+    """
     resume_data = state.get("resume_data", {})
     job_desc = state.get("job_description", "")
+    llm_requested = state.get("ats_llm_requested", False)
     
     if not resume_data or not job_desc:
-        return {"ats_score": 0, "ats_feedback": ["Not enough data"]}
-        
-    result = calculate_ats_score(job_desc, resume_data)
+        return {"ats_score": 0, "ats_feedback": ["Not enough data"]}, False
+
+    fingerprint = ats_fingerprint(job_desc, resume_data)
+    if fingerprint == state.get("ats_fingerprint") and not llm_requested:
+        # Nothing material changed since the last scan, keep its score and feedback
+        return {}, False
+
+    pending = state.get("ats_pending_changes", 0)
+    if fingerprint != state.get("ats_fingerprint"):
+        pending += 1
+
+    # Instant deterministic score first
+    local = score_resume(job_desc, resume_data)
+    update = {
+        "ats_score": local["score"],
+        "ats_feedback": local["feedback"],
+        "ats_missing_keywords": local["missing_keywords"],
+        "ats_source": "local",
+        "ats_fingerprint": fingerprint,
+        "ats_pending_changes": pending
+    }
+
+    if llm_requested:
+        return update, True
+    if local["score"] < ATS_LLM_THRESHOLD:
+        return update, False
+    if pending < ATS_RESCORE_EVERY and state.get("ats_source") == "llm":
+        # Rescan deferred by policy; the last LLM score stays authoritative meanwhile
+        return {"ats_fingerprint": fingerprint, "ats_pending_changes": pending}, False
+    return update, True
+
+def apply_llm_ats_result(update, result):
     return {
+        **update,
         "ats_score": result["score"],
-        "ats_feedback": result["feedback"]
+        "ats_feedback": result["feedback"],
+        "ats_missing_keywords": result.get("missing_keywords", update.get("ats_missing_keywords", [])),
+        "ats_source": "llm",
+        "ats_pending_changes": 0,
+        "ats_llm_requested": False
+    }
+
+def local_ats_fallback(update):
+    return {**update, "ats_source": "local", "ats_llm_requested": False}
+
+def ats_node(state: AgentState):
+    update, run_llm = plan_ats_scan(state)
+    if run_llm:
+        try:
+            result = calculate_ats_score(state["job_description"], state["resume_data"])
+            update = apply_llm_ats_result(update, result)
+        except Exception as e:
+            # Keep the local score; a failed scan must not take the interviewer's question down with it
+            print(f"Error in ATS scan: {e}")
+            update = local_ats_fallback(update)
+    return update
+
+async def aats_node(state: AgentState):
+    update, run_llm = plan_ats_scan(state)
+    if run_llm:
+        try:
+            result = await acalculate_ats_score(state["job_description"], state["resume_data"])
+            update = apply_llm_ats_result(update, result)
+        except Exception as e:
+            print(f"Error in ATS scan: {e}")
+            update = local_ats_fallback(update)
+    return update
+
+def fused_inputs(state: AgentState):
+    """Arguments for run_fused_turn / arun_fused_turn from the turn's state."""
+    resume_data = state.get("resume_data", {})
+    user_response = state.get("user_last_response", "")
+    # Asked for up front; only applied if the update leaves the resume needing one
+    write_summary = bool(user_response) and not resume_data.get("summary") and bool(
+        resume_data.get("experience") or resume_data.get("projects") or resume_data.get("skills")
+    )
+    return dict(
+        user_input=user_response,
+        job_description=state.get("job_description", ""),
+        resume_data=resume_data,
+        history=recent_history(state),
+        missing_sections=completeness_for_state(state)["missing_sections"],
+        history_summary=state.get("history_summary", ""),
+        write_summary=write_summary
+    )
+
+def apply_fused_turn(state: AgentState, turn):
+    """Builds the state update of a fused turn, mirroring what the separate nodes would write."""
+    resume_data = state.get("resume_data", {})
+    user_response = state.get("user_last_response", "")
+    version = state.get("resume_version", 0)
+    history = []
+
+    if user_response:
+        if turn.get("section") != "none" and turn.get("content"):
+            apply_analysis(resume_data, turn)
+        else:
+            record_raw_note(resume_data, user_response)
+        if needs_summary(resume_data) and turn.get("summary"):
+            resume_data["summary"] = turn["summary"]
+        version += 1
+        history.append(f"User: {user_response}")
+
+    question = turn["next_question"]
+    history.append(f"AI: {question}")
+    update, _ = plan_ats_scan({**state, "resume_data": resume_data})
+    update = apply_llm_ats_result(update, {
+        "score": turn["ats_score"],
+        "feedback": turn["ats_feedback"],
+        "missing_keywords": turn["missing_keywords"]
+    })
+    return {
+        **update,
+        "resume_data": resume_data,
+        "history": history,
+        "current_question": question,
+        "resume_version": version,
+        "completeness": evaluate_completeness(resume_data, version)
     }
 
+def fused_turn_node(state: AgentState):
+    return apply_fused_turn(state, run_fused_turn(**fused_inputs(state)))
+
+async def afused_turn_node(state: AgentState):
+    return apply_fused_turn(state, await arun_fused_turn(**fused_inputs(state)))
+
+def run_llm_ats_scan(state: AgentState):
+    """Runs the full LLM scan on demand, outside a chat turn. Returns the state update."""
+    return ats_node({**state, "ats_llm_requested": True})
+
+async def arun_llm_ats_scan(state: AgentState):
+    return await aats_node({**state, "ats_llm_requested": True})
+
 # Define the Graph
-workflow = StateGraph(AgentState)
+def build_workflow(process_input, ats_scan, interviewer):
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("process_input", process_input)
+    workflow.add_node("ats_scan", ats_scan)
+    workflow.add_node("interviewer", interviewer)
+
+    # Flow
+    # Start -> Process Input (if any) -> [ATS Scan || Interviewer] -> End (wait for user input)
+    # The interviewer does not read the ATS score, so both branches run in the same superstep.
+    # Old turns are folded into history_summary between turns, see .history_summary
+
+    workflow.set_entry_point("process_input")
+    workflow.add_edge("process_input", "ats_scan")
+    workflow.add_edge("process_input", "interviewer")
+    workflow.add_edge(["ats_scan", "interviewer"], END)
+    return workflow
+
+def build_fused_workflow(fused_turn):
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("fused_turn", fused_turn)
+
+    # Start -> Fused Turn -> End
+    workflow.add_edge(START, "fused_turn")
+    workflow.add_edge("fused_turn", END)
+    return workflow
+
+workflows = {
+    ("graph", False): build_workflow(
+        timed("process_input", processing_node),
+        timed("ats_scan", ats_node),
+        timed("interviewer", interview_node)
+    ),
+    # Same graph with async nodes, driven from the shared event loop in .runtime
+    ("graph", True): build_workflow(
+        atimed("process_input", aprocessing_node),
+        atimed("ats_scan", aats_node),
+        atimed("interviewer", ainterview_node)
+    ),
+    # One structured LLM call per turn instead of three (AGENT_TURN_MODE=fused)
+    ("fused", False): build_fused_workflow(timed("fused_turn", fused_turn_node)),
+    ("fused", True): build_fused_workflow(atimed("fused_turn", afused_turn_node)),
+}
+
+# Stateless graphs: the caller passes the whole state every turn
+app = workflows[("graph", False)].compile()
+async_app = workflows[("graph", True)].compile()
+fused_app = workflows[("fused", False)].compile()
+async_fused_app = workflows[("fused", True)].compile()
+
+@functools.lru_cache(maxsize=None)
+def _checkpointed_app(turn_mode, use_async):
+    from .checkpointer import get_checkpointer
+    return workflows[(turn_mode, use_async)].compile(checkpointer=get_checkpointer())
+
+def select_app(turn_mode=None, use_async=False, checkpointed=False):
+    """Returns the compiled graph for a turn mode (defaults to AGENT_TURN_MODE).
+
+    Checkpointed graphs persist state per session in MongoDB (see .checkpointer).
+    """
+    turn_mode = "fused" if (turn_mode or TURN_MODE) == "fused" else "graph"
+    if checkpointed:
+        return _checkpointed_app(turn_mode, use_async)
+    return {
+        ("graph", False): app, ("graph", True): async_app,
+        ("fused", False): fused_app, ("fused", True): async_fused_app,
+    }[(turn_mode, use_async)]
+
+def session_config(session_id):
+    return {"configurable": {"thread_id": str(session_id)}}
+
+def load_session_state(session_id):
+    """Returns the checkpointed state of a session (one indexed read), or None."""
+    snapshot = select_app(checkpointed=True).get_state(session_config(session_id))
+    return dict(snapshot.values) if snapshot.values else None
+
+# Channels the checkpoint accumulates itself; resending them would append them twice
+CHECKPOINT_ACCUMULATED_KEYS = {"history", "node_timings"}
+
+def _turn_args(state, session_id):
+    """Input and config for one turn; with a session the checkpoint holds the accumulated channels."""
+    if session_id is None:
+        return state, None
+    turn_input = {k: v for k, v in state.items() if k not in CHECKPOINT_ACCUMULATED_KEYS}
+    return turn_input, session_config(session_id)
+
+STREAM_MODES = ["messages", "updates", "values"]
 
-workflow.add_node("process_input", processing_node)
-workflow.add_node("ats_scan", ats_node)
-workflow.add_node("interviewer", interview_node)
+def _stream_event(mode, chunk):
+    """Translates one LangGraph stream item into stream_turn events."""
+    if mode == "messages":
+        message, metadata = chunk
+        if metadata.get("langgraph_node") == "interviewer" and message.text:
+            return [("token", message.text)]
+        return []
+    if mode == "updates":
+        return [("node", name, update or {}) for name, update in chunk.items()]
+    return []
 
-# Flow
-# Start -> Process Input (if any) -> ATS Scan -> Interviewer -> End (wait for user input)
+def stream_turn(state: AgentState, turn_mode=None, session_id=None):
+    """Runs one chat turn and yields events as they happen.
 
-workflow.set_entry_point("process_input")
-workflow.add_edge("process_input", "ats_scan")
-workflow.add_edge("ats_scan", "interviewer")
-workflow.add_edge("interviewer", END)
+    Yields ("token", text) for each interviewer token, ("node", name, update) when a
+    node finishes and finally ("done", final_state). The fused mode streams no tokens,
+    its question arrives with the structured result. With a session_id the turn runs
+    on the checkpointed graph.
+    """
+    final_state = state
+    turn_input, config = _turn_args(state, session_id)
+    compiled = select_app(turn_mode, checkpointed=session_id is not None)
+    for mode, chunk in compiled.stream(turn_input, config, stream_mode=STREAM_MODES):
+        if mode == "values":
+            final_state = chunk
+        yield from _stream_event(mode, chunk)
+    yield ("done", final_state)
 
-app = workflow.compile()
+async def astream_turn(state: AgentState, turn_mode=None, session_id=None):
+    """Async counterpart of stream_turn, running the async-compiled graph."""
+    final_state = state
+    turn_input, config = _turn_args(state, session_id)
+    compiled = select_app(turn_mode, use_async=True, checkpointed=session_id is not None)
+    async for mode, chunk in compiled.astream(turn_input, config, stream_mode=STREAM_MODES):
+        if mode == "values":
+            final_state = chunk
+        for event in _stream_event(mode, chunk):
+            yield event
+    yield ("done", final_state)
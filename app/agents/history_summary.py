@@ -0,0 +1,72 @@
+"""Background folding of old chat turns into the rolling history summary.
+
+The summarizer used to be a branch of the turn's graph, so every few turns the
+turn waited for an extra LLM call. Now the builder submits the state after a
+turn; the job runs on the shared event loop and the builder merges the result
+(`history_summary`, `summarized_turns`) into its state before the next turn.
+Until then the interviewer simply sees a few more verbatim turns.
+"""
+
+import asyncio
+import os
+import threading
+
+from .agents import asummarize_conversation
+from .graph import plan_history_summary
+from .runtime import get_loop
+from core.lru import LRUCache
+
+# Finished summaries waiting for their session's next turn; sessions that never come back
+# are evicted oldest first
+HISTORY_SUMMARY_RESULTS = max(1, int(os.getenv("HISTORY_SUMMARY_RESULTS", "1024")))
+
+
+class HistorySummarizer:
+    """Runs at most one summarization per session and keeps its latest result until merged."""
+
+    def __init__(self, max_results=HISTORY_SUMMARY_RESULTS):
+        self._running = set()
+        self._results = LRUCache(maxsize=max_results)
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, state):
+        """Starts folding the turns that aged out of the window. Returns True if a job started."""
+        plan = plan_history_summary(state)
+        if not plan:
+            return False
+        with self._lock:
+            if session_id in self._running:
+                # The running job covers an earlier cutoff; the next turn submits the rest
+                return False
+            self._running.add(session_id)
+        turns, cutoff = plan
+        asyncio.run_coroutine_threadsafe(
+            self._run(session_id, state.get("history_summary", ""), turns, cutoff), get_loop()
+        )
+        return True
+
+    def is_pending(self, session_id):
+        with self._lock:
+            return session_id in self._running
+
+    async def _run(self, session_id, previous, turns, cutoff):
+        try:
+            summary = await asummarize_conversation(previous, turns)
+            self._results.set(session_id, {"history_summary": summary, "summarized_turns": cutoff})
+        except Exception as e:
+            # Keep the old summary; the batch is retried after the next turn
+            print(f"Error summarizing history: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(session_id)
+
+    def merge(self, session_id, state):
+        """Applies a finished summary to state (in place). Returns True if state changed."""
+        result = self._results.pop(session_id)
+        if not result or result["summarized_turns"] <= state.get("summarized_turns", 0):
+            return False
+        state.update(result)
+        return True
+
+
+history_summarizer = HistorySummarizer()
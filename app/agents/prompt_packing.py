@@ -0,0 +1,129 @@
+"""Prompt packing for the LLM chains.
+
+Instead of interpolating Python reprs of resume_data and the whole history,
+every chain gets a compact canonical text form: empty/None fields are dropped,
+keys are sorted, lists become one line per item, and each chain applies its
+own token budget (oldest history turns are dropped first). Savings against the
+old repr-based prompts are tracked per chain.
+"""
+
+import math
+import os
+import threading
+
+# Rough average for English text with the Gemini tokenizer
+CHARS_PER_TOKEN = 4
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("PROMPT_HISTORY_TOKEN_BUDGET", "800"))
+
+# Token budget per chain and input; inputs without a budget are packed but never truncated
+CHAIN_BUDGETS = {
+    "interview": {"resume_data": 2000, "history": HISTORY_TOKEN_BUDGET},
+    "smart_content": {"resume_data": 1500},
+    "ats": {"resume_data": 3000},
+    "summary": {"resume_data": 2000},
+    "fused_turn": {"resume_data": 3000, "history": HISTORY_TOKEN_BUDGET},
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _prune(value):
+    """Recursively drops None and empty values."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not _is_empty(v)}
+    if isinstance(value, list):
+        pruned = [_prune(v) for v in value]
+        return [v for v in pruned if not _is_empty(v)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _lines(key, value):
+    if isinstance(value, dict):
+        for sub_key in sorted(value, key=str):
+            yield from _lines(f"{key}.{sub_key}", value[sub_key])
+    elif isinstance(value, list):
+        if all(isinstance(v, str) and len(v) <= 40 for v in value):
+            # Short items (skills, keywords) stay on one line
+            yield f"{key}: {'; '.join(value)}"
+        else:
+            yield f"{key}:"
+            for item in value:
+                yield f"- {item}"
+    elif isinstance(value, str) and "\n" in value:
+        yield f"{key}:"
+        yield from (line for line in value.split("\n") if line.strip())
+    else:
+        yield f"{key}: {value}"
+
+
+def pack_resume(resume_data, budget_tokens=None):
+    """Serializes resume_data into compact canonical text, truncated to the token budget."""
+    data = _prune(resume_data or {})
+    if not data:
+        return "(empty)"
+    text = "\n".join(line for key in sorted(data) for line in _lines(key, data[key]))
+    if budget_tokens and estimate_tokens(text) > budget_tokens:
+        text = text[:budget_tokens * CHARS_PER_TOKEN].rsplit("\n", 1)[0] + "\n[truncated]"
+    return text
+
+
+def pack_history(history, budget_tokens=None):
+    """Keeps the most recent turns that fit in the token budget, oldest dropped first."""
+    if not history:
+        return "(none)"
+    if isinstance(history, str):
+        return history
+    kept, used = [], 0
+    for turn in reversed(history):
+        cost = estimate_tokens(turn) + 1
+        if budget_tokens and kept and used + cost > budget_tokens:
+            break
+        kept.append(turn)
+        used += cost
+    dropped = len(history) - len(kept)
+    prefix = [f"[{dropped} earlier turns omitted]"] if dropped else []
+    return "\n".join(prefix + list(reversed(kept)))
+
+
+def pack_inputs(chain, inputs):
+    """Returns the chain inputs with resume_data and history packed, recording token savings."""
+    budgets = CHAIN_BUDGETS.get(chain, {})
+    packed = dict(inputs)
+    if "resume_data" in inputs:
+        packed["resume_data"] = pack_resume(inputs["resume_data"], budgets.get("resume_data"))
+    if "history" in inputs:
+        packed["history"] = pack_history(inputs["history"], budgets.get("history"))
+
+    raw_tokens = sum(estimate_tokens(str(inputs[k])) for k in ("resume_data", "history") if k in inputs)
+    packed_tokens = sum(estimate_tokens(packed[k]) for k in ("resume_data", "history") if k in packed)
+    with _stats_lock:
+        stats = _stats.setdefault(chain, {"calls": 0, "raw_tokens": 0, "packed_tokens": 0})
+        stats["calls"] += 1
+        stats["raw_tokens"] += raw_tokens
+        stats["packed_tokens"] += packed_tokens
+    return packed
+
+
+def get_packing_stats():
+    """Returns per-chain call counts, estimated raw vs packed tokens and tokens saved per call."""
+    with _stats_lock:
+        return {
+            chain: {
+                **stats,
+                "saved_per_call": round((stats["raw_tokens"] - stats["packed_tokens"]) / stats["calls"], 1)
+            }
+            for chain, stats in _stats.items()
+        }
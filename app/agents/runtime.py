@@ -0,0 +1,56 @@
+"""Process-wide event loop for async graph execution.
+
+Streamlit runs each user's script on its own thread. Instead of each of those
+threads blocking on synchronous LLM calls, turns are submitted to a single
+event loop running on a daemon thread, where all Gemini requests share one
+connection pool and a semaphore bounding concurrent calls
+(LLM_MAX_CONCURRENCY).
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+
+LLM_MAX_CONCURRENCY = max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+_loop = None
+_loop_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_loop():
+    """Returns the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agent-event-loop", daemon=True).start()
+        return _loop
+
+
+def llm_semaphore():
+    """Returns the semaphore bounding concurrent LLM calls on the running loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
+def run_sync(coro):
+    """Runs a coroutine on the shared loop and blocks the calling thread for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def iterate_sync(agen):
+    """Iterates an async generator on the shared loop from synchronous code."""
+    loop = get_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
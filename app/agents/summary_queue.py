@@ -0,0 +1,130 @@
+"""Background resume summary generation.
+
+The professional summary is no longer written inside the chat turn. After a
+turn the builder submits a job here; it runs on the shared event loop, stores
+the result on the session document (`generated_summary`), and the builder
+merges it into resume_data on its next rerun. A summary is regenerated only
+when the sections it was written from change substantially, and never replaces
+one the user wrote.
+"""
+
+import asyncio
+import copy
+import os
+import threading
+from datetime import datetime, timezone
+
+from .agents import agenerate_resume_summary
+from .runtime import get_loop
+from services.completeness import count_skills
+
+# Sections the summary is written from
+SUMMARY_SOURCES = ("experience", "projects", "skills", "education")
+
+# Items added or removed across SUMMARY_SOURCES before the summary is rewritten
+SUMMARY_REGEN_MIN_CHANGES = max(1, int(os.getenv("SUMMARY_REGEN_MIN_CHANGES", "2")))
+
+
+def _count_items(value):
+    if isinstance(value, dict):
+        return sum(_count_items(v) for v in value.values())
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, str):
+        return len([line for line in value.split("\n") if line.strip()])
+    return 0
+
+
+def summary_sources(resume_data):
+    """Item count per source section, stored with a summary to judge later changes."""
+    return {
+        key: count_skills(resume_data.get(key)) if key == "skills" else _count_items(resume_data.get(key))
+        for key in SUMMARY_SOURCES
+    }
+
+
+def should_regenerate(resume_data, generated):
+    """Whether a (new) summary should be generated for resume_data.
+
+    `generated` is the session's stored `generated_summary`, if any.
+    """
+    summary = resume_data.get("summary")
+    if summary and summary != (generated or {}).get("text"):
+        # Written by the user (or by a fused turn); never overwritten
+        return False
+    if not ((resume_data.get("experience") or resume_data.get("projects")) and resume_data.get("skills")):
+        return False
+    if not generated:
+        return True
+    old, new = generated.get("sources", {}), summary_sources(resume_data)
+    if any(new[key] and not old.get(key) for key in new):
+        # A whole new section appeared
+        return True
+    return sum(abs(new[key] - old.get(key, 0)) for key in new) >= SUMMARY_REGEN_MIN_CHANGES
+
+
+def merge_generated_summary(resume_data, generated):
+    """Puts a generated summary into resume_data (in place) unless the user wrote their own.
+
+    Returns True if resume_data changed.
+    """
+    if not generated or resume_data.get("summary") == generated["text"]:
+        return False
+    summary = resume_data.get("summary")
+    if summary and summary != generated.get("replaces"):
+        return False
+    resume_data["summary"] = generated["text"]
+    return True
+
+
+def _save_to_session(session_id, generated):
+    from core.database import db
+    db.set_generated_summary(session_id, generated)
+
+
+class SummaryQueue:
+    """Runs at most one summary job per session; a job submitted while one is running
+    replaces any queued one and starts when the running one finishes."""
+
+    def __init__(self, save=_save_to_session):
+        self._save = save
+        self._running = set()
+        self._queued = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, job_description, resume_data, previous=None):
+        """Queues a summary for resume_data; `previous` is the generated text it replaces."""
+        job = (job_description, copy.deepcopy(resume_data))
+        with self._lock:
+            if session_id in self._running:
+                self._queued[session_id] = job
+                return
+            self._running.add(session_id)
+        asyncio.run_coroutine_threadsafe(self._run(session_id, job, previous), get_loop())
+
+    def is_pending(self, session_id):
+        with self._lock:
+            return session_id in self._running
+
+    async def _run(self, session_id, job, previous):
+        while job:
+            job_description, resume_data = job
+            try:
+                text = await agenerate_resume_summary(job_description, resume_data)
+                generated = {
+                    "text": text,
+                    "sources": summary_sources(resume_data),
+                    "replaces": previous,
+                    "created_at": datetime.now(timezone.utc)
+                }
+                await asyncio.to_thread(self._save, session_id, generated)
+                previous = text
+            except Exception as e:
+                print(f"Error generating summary: {e}")
+            with self._lock:
+                job = self._queued.pop(session_id, None)
+                if job is None:
+                    self._running.discard(session_id)
+
+
+summary_queue = SummaryQueue()
@@ -1,16 +1,90 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 import streamlit as st
 from .database import db
 
-def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# Cost factor for new hashes; stored hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a thread pool spreads hashing over the pod's cores
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))
+# Requests allowed to wait for a worker before new ones are turned away
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "64"))
+BCRYPT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("BCRYPT_QUEUE_TIMEOUT_SECONDS", "10"))
+
+class AuthBusyError(Exception):
+    """Raised when the bcrypt pool stays full for longer than the queue timeout."""
+
+class BcryptPool:
+    """Bounded worker pool for bcrypt calls, keeping them off the Streamlit script threads."""
+
+    def __init__(self, workers=BCRYPT_WORKERS, max_queue=BCRYPT_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def run(self, fn, *args, timeout=BCRYPT_QUEUE_TIMEOUT_SECONDS):
+        """Runs fn(*args) on the pool and waits for its result."""
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._rejected += 1
+            raise AuthBusyError("Too many concurrent logins, please retry shortly")
+        with self._lock:
+            self._queued += 1
+        try:
+            return self._executor.submit(self._call, fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _call(self, fn, *args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
+
+bcrypt_pool = BcryptPool()
+
+def bcrypt_cost(hashed_password):
+    """Returns the cost factor encoded in a bcrypt hash ("$2b$12$..." -> 12)."""
+    return int(hashed_password.split("$")[2])
+
+def hash_password(password, rounds=None):
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt_pool.run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
 
 def verify_password(password, hashed_password):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return bcrypt_pool.run(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def login_user(email, password):
     user = db.get_user(email)
     if user and verify_password(password, user['password']):
+        # Transparently move the stored hash to the configured cost factor
+        if bcrypt_cost(user['password']) != BCRYPT_ROUNDS:
+            user['password'] = hash_password(password)
+            db.update_user_password(email, user['password'])
         return user
     return None
 
@@ -36,4 +110,5 @@ def init_session_state():
 def logout():
     st.session_state.user = None
     st.session_state.authenticated = False
+    st.session_state.pop("dashboard_sessions", None)
     st.rerun()
@@ -0,0 +1,77 @@
+"""Query plan diagnostics.
+
+Prints the winning `explain()` plan for every query the app issues and exits
+non-zero if any of them falls back to a collection scan:
+
+    cd app && python -m core.diagnostics [email]
+"""
+
+import sys
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from pymongo import DESCENDING
+
+from .database import db, SESSIONS_PAGE_SIZE
+
+
+def app_queries(email, session_id):
+    """Every query shape the app issues, as (name, cursor) pairs.
+
+    Updates are explained through the equivalent find on the same filter.
+    """
+    page_sort = [("created_at", DESCENDING), ("_id", DESCENDING)]
+    now = datetime.now(timezone.utc)
+    return [
+        ("users.get_user", db.users.find({"email": email}).limit(1)),
+        ("users.update_user_profile", db.users.find({"email": email})),
+        ("sessions.get_user_sessions", db.sessions.find({"email": email}).sort("created_at", DESCENDING)),
+        ("sessions.get_user_sessions_page", db.sessions.find({"email": email}).sort(page_sort).limit(SESSIONS_PAGE_SIZE + 1)),
+        # Later pages resume after the previous page's (created_at, _id) cursor
+        ("sessions.get_user_sessions_page[cursor]", db.sessions.find({"email": email, "$or": [
+            {"created_at": {"$lt": now}},
+            {"created_at": now, "_id": {"$lt": session_id}},
+            {"created_at": None}
+        ]}).sort(page_sort).limit(SESSIONS_PAGE_SIZE + 1)),
+        ("sessions.get_user_sessions_page[legacy cursor]", db.sessions.find(
+            {"email": email, "created_at": None, "_id": {"$lt": session_id}}
+        ).sort(page_sort).limit(SESSIONS_PAGE_SIZE + 1)),
+        ("sessions.get_session", db.sessions.find({"_id": session_id}).limit(1)),
+        ("sessions.update_session", db.sessions.find({"_id": session_id})),
+    ]
+
+
+def plan_stages(plan):
+    """Returns the stage names of a winning plan, outermost first."""
+    # Slot-based execution nests the classic plan under `queryPlan`
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage", "?")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+def explain_queries(email="diagnostics@example.com", session_id=None):
+    """Returns {query name: [stage, ...]} for the winning plan of each app query."""
+    session_id = session_id or ObjectId()
+    plans = {}
+    for name, cursor in app_queries(email, session_id):
+        explained = cursor.explain()
+        plans[name] = plan_stages(explained["queryPlanner"]["winningPlan"])
+    return plans
+
+
+def main(argv):
+    db.ensure_indexes()
+    plans = explain_queries(*argv[:1])
+    collscans = [name for name, stages in plans.items() if "COLLSCAN" in stages]
+    for name, stages in plans.items():
+        marker = "❌" if name in collscans else "✅"
+        print(f"{marker} {name}: {' <- '.join(stages)}")
+    return 1 if collscans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,12 @@
+import hashlib
+import json
+
+
+def canonical_json(value):
+    """Serialize a value to a stable JSON string (sorted keys, no whitespace)."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def canonical_hash(*parts):
+    """Returns a SHA-256 hex digest of the canonical JSON form of the given parts."""
+    return hashlib.sha256(canonical_json(list(parts)).encode("utf-8")).hexdigest()
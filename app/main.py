@@ -1,5 +1,5 @@
 import streamlit as st
-from core.auth import init_session_state, login_user, register_user, logout
+from core.auth import init_session_state, login_user, register_user, logout, AuthBusyError
 from core.database import db
 from ui.components import profile_form, load_custom_css, session_card
 
@@ -12,6 +12,14 @@ load_custom_css()
 # Initialize Session State
 init_session_state()
 
+@st.cache_resource
+def bootstrap_database():
+    """Runs once per process: make sure the indexes our queries rely on exist."""
+    db.ensure_indexes()
+    return True
+
+bootstrap_database()
+
 def login_page():
     # Centered Login Card
     col1, col2, col3 = st.columns([1, 1.5, 1])
@@ -26,7 +34,11 @@ def login_page():
             submit = st.form_submit_button("Login", use_container_width=True)
             
             if submit:
-                user = login_user(email, password)
+                try:
+                    user = login_user(email, password)
+                except AuthBusyError:
+                    st.error("We're seeing a lot of logins right now. Please try again in a few seconds.")
+                    st.stop()
                 if user:
                     st.session_state.user = user
                     st.session_state.authenticated = True
@@ -50,7 +62,10 @@ def signup_page():
             submit = st.form_submit_button("Sign Up", use_container_width=True)
             
             if submit:
-                success, msg = register_user(email, password, name)
+                try:
+                    success, msg = register_user(email, password, name)
+                except AuthBusyError:
+                    success, msg = False, "We're seeing a lot of sign-ups right now. Please try again in a few seconds."
                 if success:
                     st.success(msg)
                 else:
@@ -61,10 +76,12 @@ def dashboard_page():
     st.caption("Manage your profile and resume sessions below.")
     
     tab1, tab2 = st.tabs(["👤 Profile", "📁 My Resumes"])
+
+    # Fetched once per run and shared by both tabs
+    current_profile = db.get_user_profile(st.session_state.user['email'])
     
     with tab1:
         st.header("Your Profile")
-        current_profile = db.get_user_profile(st.session_state.user['email'])
         updated_profile = profile_form(current_profile)
         
         if updated_profile:
@@ -78,7 +95,12 @@ def dashboard_page():
         
         with col1:
             st.subheader("📂 Your Sessions")
-            sessions = db.get_user_sessions(st.session_state.user['email'])
+            # Pages already loaded are kept across reruns; "Load more" fetches the next one
+            if "dashboard_sessions" not in st.session_state:
+                first_page, cursor = db.get_user_sessions_page(st.session_state.user['email'])
+                st.session_state.dashboard_sessions = first_page
+                st.session_state.dashboard_sessions_cursor = cursor
+            sessions = st.session_state.dashboard_sessions
             
             if not sessions:
                 st.info("You haven't created any resumes yet. Start by pasting a job description!")
@@ -92,9 +114,19 @@ def dashboard_page():
                         with cols[i]:
                             if session_card(session, on_click_key=f"btn_{session['_id']}"):
                                 st.session_state.session_id = str(session['_id'])
-                                st.session_state.job_description = session['job_description']
+                                st.session_state.job_description = db.get_session(session['_id'])['job_description']
                                 st.switch_page("pages/builder.py")
 
+                if st.session_state.dashboard_sessions_cursor is not None:
+                    if st.button("⬇️ Load more", use_container_width=True):
+                        next_page, cursor = db.get_user_sessions_page(
+                            st.session_state.user['email'],
+                            cursor=st.session_state.dashboard_sessions_cursor
+                        )
+                        st.session_state.dashboard_sessions.extend(next_page)
+                        st.session_state.dashboard_sessions_cursor = cursor
+                        st.rerun()
+
         with col2:
             st.subheader("🚀 New Resume")
             st.markdown("""
@@ -105,8 +137,7 @@ def dashboard_page():
             job_description = st.text_area("Job Description", height=220, placeholder="Paste job description here...")
             
             # Check Profile Completeness
-            # Fetch profile again to be sure (or reuse current_profile if available in scope - it is not available in tab2 scope easily, so fetch)
-            user_profile = db.get_user_profile(st.session_state.user['email'])
+            user_profile = current_profile
             
             has_skills = bool(user_profile.get("skills"))
             has_experience = bool(user_profile.get("experience"))
@@ -118,6 +149,7 @@ def dashboard_page():
                 if st.button("🎯 Start Building", type="primary", use_container_width=True):
                     if job_description:
                         session_id = db.create_session(st.session_state.user['email'], job_description)
+                        st.session_state.pop("dashboard_sessions", None)
                         st.session_state.session_id = session_id
                         st.session_state.job_description = job_description
                         st.switch_page("pages/builder.py")
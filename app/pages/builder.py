@@ -1,14 +1,23 @@
 import streamlit as st
 import sys
 import os
+import time
+import copy
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from agents.graph import app
-from core.database import db
-from ui.components import load_custom_css, ats_score_card
+from agents.graph import astream_turn, arun_llm_ats_scan, load_session_state
+from agents.runtime import run_sync, iterate_sync
+from agents.prompt_packing import get_packing_stats
+from agents.agents import get_parse_stats, get_cache_stats
+from agents.summary_queue import summary_queue, should_regenerate, merge_generated_summary
+from agents.history_summary import history_summarizer
+from core.database import db, ConcurrentUpdateError
+from core.auth import bcrypt_pool
+from ui.components import load_custom_css, ats_score_card, resume_preview_html
 from services.pdf_generator import get_pdf_download_data
+from services.completeness import completeness_for_state
 
 st.set_page_config(page_title="Resume Builder Chat", page_icon="💬", layout="wide")
 
@@ -29,6 +38,13 @@ if not session:
     st.error("Session not found.")
     st.stop()
 
+# The builder's state belongs to the session it was built for; after switching sessions on
+# the dashboard, rebuild it rather than running (and saving) the new session on the old one's state
+if st.session_state.get("builder_session_id") != st.session_state.session_id:
+    for key in ("graph_state", "messages", "saved_resume_data", "session_version"):
+        st.session_state.pop(key, None)
+    st.session_state.builder_session_id = st.session_state.session_id
+
 # Initialize Chat History
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -70,6 +86,44 @@ if "graph_state" not in st.session_state:
         "ats_feedback": []
     }
 
+    # Resume where the session left off: history, ATS results and the rolling summary come from
+    # its checkpoint, with no LLM calls. resume_data stays the stored copy (another tab may have
+    # saved since), so the cached completeness report is dropped.
+    restored = load_session_state(st.session_state.session_id) if stored_resume_data else None
+    if restored:
+        restored.pop("completeness", None)
+        st.session_state.graph_state = {
+            **restored,
+            "job_description": st.session_state.job_description,
+            "resume_data": initial_resume_data,
+            "user_last_response": ""
+        }
+        st.session_state.messages = [
+            {"role": "user" if turn.startswith("User: ") else "assistant", "content": turn.split(": ", 1)[-1]}
+            for turn in restored.get("history", [])
+        ] or st.session_state.messages
+    # What the database holds, so saves only write what changed
+    st.session_state.saved_resume_data = copy.deepcopy(stored_resume_data)
+    st.session_state.session_version = session.get("version", 0)
+
+# Pick up a summary generated in the background since the last run; it is saved with the next turn
+if merge_generated_summary(st.session_state.graph_state["resume_data"], session.get("generated_summary")):
+    st.session_state.graph_state["resume_version"] = st.session_state.graph_state.get("resume_version", 0) + 1
+
+# --- PREVIEW ---
+def live_preview(resume_data, user_name):
+    """Renders the resume preview as a single markdown element. Every script rerun draws it,
+    but the HTML is memoized on the resume's content hash, so unchanged resumes cost a lookup."""
+    st.markdown(resume_preview_html(resume_data, user_name), unsafe_allow_html=True)
+
+@st.fragment(run_every=2)
+def summary_watcher(session_id):
+    """Polls while a background summary is being written and reruns the page once it is stored."""
+    if summary_queue.is_pending(session_id):
+        st.caption("✍️ Writing your professional summary...")
+    else:
+        st.rerun()
+
 # --- LAYOUT ---
 st.title("📝 Resume Builder")
 
@@ -85,142 +139,52 @@ col_preview, col_chat = st.columns([1.1, 1])
 with col_preview:
     # ATS Score Card
     st.subheader("📊 ATS Score")
-    ats_score_card(ats_score, ats_feedback)
+    # Placeholder so a streaming turn can refresh the card as soon as ats_scan finishes
+    ats_slot = st.empty()
+    with ats_slot.container():
+        ats_score_card(ats_score, ats_feedback, st.session_state.graph_state.get("ats_source"))
+
+    # The AI scan runs automatically above the local threshold; this forces it early
+    if st.button("🤖 Run full AI scan", disabled=not resume_data):
+        with st.spinner("Scanning your resume..."):
+            st.session_state.graph_state.update(run_sync(arun_llm_ats_scan(st.session_state.graph_state)))
+        st.rerun()
     
     st.divider()
     
     # Resume Preview - "Paper" Style
     st.subheader("📄 Live Preview")
     
-    # Paper Container
-    st.markdown("""
-    <div class="resume-paper">
-    """, unsafe_allow_html=True)
-    
-    with st.container():
-        # Header
-        st.markdown(f"<h2 style='color: #333 !important; text-align: center; margin-bottom: 5px;'>{user_name}</h2>", unsafe_allow_html=True)
-        
-        contact = resume_data.get('contact', {})
-        contact_info = []
-        if contact.get('phone'): contact_info.append(contact['phone'])
-        if contact.get('email'): contact_info.append(contact['email'])
-        if contact.get('address'): contact_info.append(contact['address'].split('\n')[0])
-        
-        if contact_info:
-            st.markdown(f"<p style='color: #666 !important; text-align: center; font-size: 0.9rem;'>{' • '.join(contact_info)}</p>", unsafe_allow_html=True)
-        
-        st.markdown("<hr style='border-color: #ccc;'>", unsafe_allow_html=True)
-        
-        # Summary
-        summary = resume_data.get('summary', '')
-        if summary:
-            st.markdown("<h4 style='color: #333 !important;'>Summary</h4>", unsafe_allow_html=True)
-            st.markdown(f"<p style='color: #444 !important;'>{summary}</p>", unsafe_allow_html=True)
-        
-        # Experience
-        experience = resume_data.get('experience', [])
-        if experience:
-            st.markdown("<h4 style='color: #333 !important;'>Experience</h4>", unsafe_allow_html=True)
-            for item in experience:
-                st.markdown(f"<li style='color: #444 !important;'>{item}</li>", unsafe_allow_html=True)
-        
-        # Projects
-        projects = resume_data.get('projects', [])
-        if projects:
-            st.markdown("<h4 style='color: #333 !important;'>Projects</h4>", unsafe_allow_html=True)
-            for project in projects:
-                st.markdown(f"<li style='color: #444 !important;'>{project}</li>", unsafe_allow_html=True)
-        
-        # Skills
-        skills = resume_data.get('skills', [])
-        if skills:
-            st.markdown("<h4 style='color: #333 !important;'>Skills</h4>", unsafe_allow_html=True)
-            if isinstance(skills, dict):
-                 for category, skill_list in skills.items():
-                     if isinstance(skill_list, list):
-                         text = f"<b>{category}:</b> {', '.join(skill_list)}"
-                     else:
-                         text = f"<b>{category}:</b> {str(skill_list)}"
-                     st.markdown(f"<p style='color: #444 !important; margin-bottom: 2px;'>{text}</p>", unsafe_allow_html=True)
-            else:
-                 skills_text = " • ".join(skills) if isinstance(skills, list) else str(skills)
-                 st.markdown(f"<p style='color: #444 !important;'>{skills_text}</p>", unsafe_allow_html=True)
-
-        # Education
-        education = resume_data.get('education')
-        if education:
-            st.markdown("<h4 style='color: #333 !important;'>Education</h4>", unsafe_allow_html=True)
-            if isinstance(education, list):
-                for edu in education:
-                    st.markdown(f"<p style='color: #444 !important;'>{edu}</p>", unsafe_allow_html=True)
-            else:
-                st.markdown(f"<p style='color: #444 !important;'>{education}</p>", unsafe_allow_html=True)
-                
-        # Achievements (Optional)
-        achievements = resume_data.get('achievements', [])
-        if achievements:
-            st.markdown("<h4 style='color: #333 !important;'>Achievements</h4>", unsafe_allow_html=True)
-            for ach in achievements:
-                st.markdown(f"<li style='color: #444 !important;'>{ach}</li>", unsafe_allow_html=True)
-        
-        # Fallback for raw notes
-        raw_notes = resume_data.get('raw_notes', [])
-        if raw_notes and not experience and not projects:
-             st.markdown("<h4 style='color: #333 !important;'>Details</h4>", unsafe_allow_html=True)
-             for note in raw_notes:
-                 st.markdown(f"<li style='color: #444 !important;'>{note}</li>", unsafe_allow_html=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
+    preview_slot = st.empty()
+    with preview_slot.container():
+        live_preview(resume_data, user_name)
+    if summary_queue.is_pending(st.session_state.session_id):
+        summary_watcher(st.session_state.session_id)
     
     # Debug JSON
     with st.expander("🔍 View Raw Data"):
         st.json(resume_data)
 
-    # --- COMPLETENESS CHECK ---
-    def check_completeness(data):
-        missing = []
-        
-        # 1. Contact Info
-        contact = data.get("contact", {})
-        if not contact.get("phone"): missing.append("Phone Number")
-        if not contact.get("email"): missing.append("Email Address")
-        
-        # 2. Summary
-        if not data.get("summary") and not (data.get("raw_notes") and len(data.get("raw_notes")) >= 2):
-            missing.append("Professional Summary")
-            
-        # 3. Education
-        if not data.get("education"): missing.append("Education")
-        
-        # 4. Experience/Projects (Context Dependent)
-        exp_level = data.get("experience_level", "fresher")
-        if exp_level == "experienced":
-            if not data.get("experience"): missing.append("Work Experience")
-        else:
-            projects = data.get("projects", [])
-            if not projects or len(projects) < 3: 
-                missing.append(f"Projects (Need {3 - len(projects)} more)")
-            
-            skills = data.get("skills", [])
-            has_enough_skills = False
-            if isinstance(skills, dict):
-                 # Count total skills inside categories
-                 total_skills = sum(len(v) for v in skills.values() if isinstance(v, list))
-                 has_enough_skills = total_skills >= 3
-            elif isinstance(skills, list):
-                 has_enough_skills = len(skills) >= 3
-            
-            if not has_enough_skills: missing.append("Skills (at least 3)")
-            
-        # 5. Achievements (Optional but if started, must have 2)
-        ach = data.get("achievements", [])
-        if ach and len(ach) < 2:
-            missing.append("Achievements (Optional - but need >= 2 if included)")
-            
-        return len(missing) == 0, missing
+    # Per-node latency of the last chat turn (ats_scan and interviewer run in parallel)
+    if "last_turn_latency" in st.session_state:
+        with st.expander("⏱️ Last Turn Latency"):
+            st.json(st.session_state.last_turn_latency)
+            st.caption("Prompt tokens per chain (estimated)")
+            st.json(get_packing_stats())
+            st.caption("Structured output parse failures per chain")
+            st.json(get_parse_stats())
+            st.caption("LLM response cache hits and misses per chain")
+            st.json(get_cache_stats())
+            st.caption("MongoDB connection pool (this process)")
+            st.json(db.pool_metrics())
+            st.caption("Password hashing pool (queue depth and rejections)")
+            st.json(bcrypt_pool.metrics())
 
-    is_complete, missing_items = check_completeness(resume_data)
+    # --- COMPLETENESS CHECK ---
+    # Cached on the graph state; only recomputed when resume_version moves
+    completeness = completeness_for_state(st.session_state.graph_state)
+    st.session_state.graph_state["completeness"] = completeness
+    is_complete, missing_items = completeness["is_complete"], completeness["missing"]
 
     # PDF Download Section
     st.divider()
@@ -270,20 +234,16 @@ with col_preview:
     with col_dl_2:
         # Mini checklist visualization
         st.markdown("**Checklist**")
-        st.checkbox("Contact Info", value=bool(resume_data.get("contact", {}).get("phone") and resume_data.get("contact", {}).get("email")), disabled=True)
-        st.checkbox("Summary", value=bool(resume_data.get("summary") or (resume_data.get("raw_notes") and len(resume_data.get("raw_notes"))>=2)), disabled=True)
-        st.checkbox("Education", value=bool(resume_data.get("education")), disabled=True)
+        st.checkbox("Contact Info", value=completeness["has_contact"], disabled=True)
+        st.checkbox("Summary", value=completeness["has_summary"], disabled=True)
+        st.checkbox("Education", value=completeness["has_education"], disabled=True)
         
-        if resume_data.get("experience_level") == "experienced":
-            st.checkbox("Experience", value=bool(resume_data.get("experience")), disabled=True)
+        if completeness["track"] == "experienced":
+            st.checkbox("Experience", value=completeness["has_experience"], disabled=True)
         else:
-            proj_count = len(resume_data.get("projects", []))
+            proj_count = completeness["project_count"]
             st.checkbox(f"Projects (Has {proj_count}/3)", value=proj_count >= 3, disabled=True)
-            
-            skills = resume_data.get("skills", [])
-            s_count = 0
-            if isinstance(skills, dict): s_count = sum(len(v) for v in skills.values())
-            elif isinstance(skills, list): s_count = len(skills)
+            s_count = completeness["skill_count"]
             st.checkbox(f"Skills (Has {s_count}/3)", value=s_count >= 3, disabled=True)
         
         st.checkbox("ATS Score > 85%", value=ats_score >= 85, disabled=True)
@@ -304,16 +264,78 @@ with col_chat:
         st.session_state.messages.append({"role": "user", "content": prompt})
         
         st.session_state.graph_state["user_last_response"] = prompt
+        # Older turns folded in the background since the last turn shrink this turn's prompt
+        history_summarizer.merge(st.session_state.session_id, st.session_state.graph_state)
+
+        with chat_container:
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            with st.chat_message("assistant"):
+                answer_slot = st.empty()
+                answer_slot.markdown("✨ Analyzing your input...")
         
-        # Run Graph
-        with st.spinner("✨ Analyzing your input..."):
-            result = app.invoke(st.session_state.graph_state)
-            st.session_state.graph_state = result
-            
-            bot_response = result.get("current_question", "I have gathered enough information.")
-            st.session_state.messages.append({"role": "assistant", "content": bot_response})
-                
-            # Save progress to DB
-            db.update_session(st.session_state.session_id, result.get("resume_data", {}))
+        # Run Graph, streaming the interviewer's question token by token
+        turn_start = time.perf_counter()
+        first_token_at = None
+        streamed = ""
+        result = st.session_state.graph_state
+        for event in iterate_sync(astream_turn(st.session_state.graph_state, session_id=st.session_state.session_id)):
+            if event[0] == "token":
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                streamed += event[1]
+                answer_slot.markdown(streamed + "▌")
+            elif event[0] == "node":
+                _, name, update = event
+                # process_input and ats_scan in graph mode; fused_turn carries both
+                if "ats_score" in update:
+                    with ats_slot.container():
+                        ats_score_card(update["ats_score"], update.get("ats_feedback", []), update.get("ats_source"))
+                if "resume_data" in update:
+                    preview_slot.markdown(resume_preview_html(update["resume_data"], user_name), unsafe_allow_html=True)
+            else:
+                result = event[1]
+
+        st.session_state.last_turn_latency = {
+            **result.get("node_timings", {}),
+            "time_to_first_token": round(first_token_at - turn_start, 3) if first_token_at else None,
+            "total": round(time.perf_counter() - turn_start, 3)
+        }
+        st.session_state.graph_state = result
+        history_summarizer.submit(st.session_state.session_id, result)
+        
+        bot_response = result.get("current_question", "I have gathered enough information.")
+        answer_slot.markdown(bot_response)
+        st.session_state.messages.append({"role": "assistant", "content": bot_response})
             
-            st.rerun()
+        # Save progress to DB (only the changed fields)
+        try:
+            st.session_state.session_version = db.update_session(
+                st.session_state.session_id,
+                result.get("resume_data", {}),
+                ats_score=result.get("ats_score"),
+                previous=st.session_state.saved_resume_data,
+                expected_version=st.session_state.session_version
+            )
+            st.session_state.saved_resume_data = copy.deepcopy(result.get("resume_data", {}))
+
+            # (Re)write the professional summary off the turn once there is enough to summarize.
+            # While a job is in flight `generated` is stale, so wait for it; the turn after it lands
+            # judges the changes against the new summary.
+            generated = session.get("generated_summary")
+            if not summary_queue.is_pending(st.session_state.session_id) and should_regenerate(result.get("resume_data", {}), generated):
+                summary_queue.submit(
+                    st.session_state.session_id,
+                    st.session_state.job_description,
+                    result.get("resume_data", {}),
+                    previous=(generated or {}).get("text")
+                )
+        except ConcurrentUpdateError:
+            # Edited elsewhere (another tab or device): reload the stored version instead of overwriting it
+            st.session_state.pop("graph_state", None)
+            st.session_state.messages = []
+            st.toast("⚠️ This resume was updated elsewhere, reloaded the latest version.")
+        # The dashboard's cached session list shows the latest ATS score
+        st.session_state.pop("dashboard_sessions", None)
+        
+        st.rerun()
@@ -0,0 +1,103 @@
+"""Resume Completeness Engine
+
+Derives every section count and download blocker from resume_data in one pass.
+The builder's "Missing Requirements" list and checklist both read the result,
+and the graph caches it on its state (keyed by `resume_version`) so the
+interviewer can ask about missing sections directly.
+"""
+
+MIN_PROJECTS = 3
+MIN_SKILLS = 3
+MIN_ACHIEVEMENTS = 2
+
+
+def count_skills(skills):
+    """Counts skills whether stored as a list, a comma-separated string or categories of either."""
+    if isinstance(skills, dict):
+        return sum(count_skills(value) for value in skills.values())
+    if isinstance(skills, list):
+        return len(skills)
+    if isinstance(skills, str):
+        return len([s for s in skills.split(",") if s.strip()])
+    return 0
+
+
+def evaluate_completeness(resume_data, version=0):
+    """Returns the completeness report for resume_data as a plain dict.
+
+    Keys: version, is_complete, missing (labels for the user), missing_sections
+    (section keys for the interviewer), track ("experienced" or "fresher"),
+    has_contact, has_summary, has_education, has_experience, project_count and
+    skill_count.
+    """
+    contact = resume_data.get("contact") or {}
+    raw_notes = resume_data.get("raw_notes") or []
+    missing, missing_sections = [], []
+
+    # 1. Contact Info
+    if not contact.get("phone"):
+        missing.append("Phone Number")
+    if not contact.get("email"):
+        missing.append("Email Address")
+    has_contact = bool(contact.get("phone") and contact.get("email"))
+    if not has_contact:
+        missing_sections.append("contact")
+
+    # 2. Summary (two raw notes are enough for the PDF's fallback summary)
+    has_summary = bool(resume_data.get("summary") or len(raw_notes) >= 2)
+    if not has_summary:
+        missing.append("Professional Summary")
+        missing_sections.append("summary")
+
+    # 3. Education
+    has_education = bool(resume_data.get("education"))
+    if not has_education:
+        missing.append("Education")
+        missing_sections.append("education")
+
+    # 4. Experience/Projects (Context Dependent)
+    track = "experienced" if resume_data.get("experience_level") == "experienced" else "fresher"
+    has_experience = bool(resume_data.get("experience"))
+    project_count = len(resume_data.get("projects") or [])
+    skill_count = count_skills(resume_data.get("skills"))
+    if track == "experienced":
+        if not has_experience:
+            missing.append("Work Experience")
+            missing_sections.append("experience")
+    else:
+        if project_count < MIN_PROJECTS:
+            missing.append(f"Projects (Need {MIN_PROJECTS - project_count} more)")
+            missing_sections.append("projects")
+        if skill_count < MIN_SKILLS:
+            missing.append(f"Skills (at least {MIN_SKILLS})")
+            missing_sections.append("skills")
+
+    # 5. Achievements (Optional but if started, must have 2)
+    achievements = resume_data.get("achievements") or []
+    if achievements and len(achievements) < MIN_ACHIEVEMENTS:
+        missing.append(f"Achievements (Optional - but need >= {MIN_ACHIEVEMENTS} if included)")
+        missing_sections.append("achievements")
+
+    return {
+        "version": version,
+        "is_complete": not missing,
+        "missing": missing,
+        "missing_sections": missing_sections,
+        "track": track,
+        "has_contact": has_contact,
+        "has_summary": has_summary,
+        "has_education": has_education,
+        "has_experience": has_experience,
+        "project_count": project_count,
+        "skill_count": skill_count,
+    }
+
+
+def completeness_for_state(state):
+    """Returns the completeness report cached on a graph state, recomputing it only
+    when `resume_version` has moved past the cached report's version."""
+    version = state.get("resume_version", 0)
+    cached = state.get("completeness")
+    if cached and cached.get("version") == version:
+        return cached
+    return evaluate_completeness(state.get("resume_data") or {}, version)
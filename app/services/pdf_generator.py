@@ -11,6 +11,20 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.colors import HexColor
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
+from html import escape
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from types import MappingProxyType
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+
+from core.hashing import canonical_hash
+from core.lru import LRUCache
+from .resume_model import NormalizedResume, normalize_resume
 
 
 # Professional Color Scheme
@@ -19,9 +33,33 @@ ACCENT_COLOR = HexColor("#3498DB")       # Bright Blue
 TEXT_COLOR = HexColor("#333333")         # Dark Gray
 LIGHT_TEXT = HexColor("#666666")         # Light Gray
 
+THEMES = {
+    "default": {
+        "primary": PRIMARY_COLOR,
+        "accent": ACCENT_COLOR,
+        "text": TEXT_COLOR,
+        "light_text": LIGHT_TEXT,
+    },
+}
+
+# Bump whenever the layout changes so cached PDFs are not served for the old template
+TEMPLATE_VERSION = "3"
+
+# Auto-fit: downloads are scaled to a single page unless PDF_FIT_SINGLE_PAGE=false
+PDF_FIT_SINGLE_PAGE = os.getenv("PDF_FIT_SINGLE_PAGE", "true").lower() == "true"
+FIT_MIN_SCALE = 0.7
+FIT_PRECISION = 0.02
+FIT_CACHE_SIZE = 512
+_fit_cache = LRUCache(maxsize=FIT_CACHE_SIZE)
 
-def create_custom_styles():
+# Rendered PDFs kept in memory; evicted entries spill to PDF_CACHE_DIR when it is set
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+
+
+def create_custom_styles(theme: str = "default"):
     """Create custom paragraph styles for the resume"""
+    colors = THEMES[theme]
     styles = getSampleStyleSheet()
     
     # Name/Header Style
@@ -29,7 +67,7 @@ def create_custom_styles():
         name='ResumeHeader',
         parent=styles['Heading1'],
         fontSize=24,
-        textColor=PRIMARY_COLOR,
+        textColor=colors["primary"],
         alignment=TA_CENTER,
         spaceAfter=6,
         fontName='Helvetica-Bold'
@@ -40,7 +78,7 @@ def create_custom_styles():
         name='ContactInfo',
         parent=styles['Normal'],
         fontSize=10,
-        textColor=LIGHT_TEXT,
+        textColor=colors["light_text"],
         alignment=TA_CENTER,
         spaceAfter=12
     ))
@@ -50,12 +88,12 @@ def create_custom_styles():
         name='SectionHeader',
         parent=styles['Heading2'],
         fontSize=14,
-        textColor=ACCENT_COLOR,
+        textColor=colors["accent"],
         spaceBefore=16,
         spaceAfter=8,
         fontName='Helvetica-Bold',
         borderWidth=2,
-        borderColor=ACCENT_COLOR,
+        borderColor=colors["accent"],
         borderPadding=4
     ))
     
@@ -64,7 +102,7 @@ def create_custom_styles():
         name='ResumeContent',
         parent=styles['Normal'],
         fontSize=11,
-        textColor=TEXT_COLOR,
+        textColor=colors["text"],
         spaceAfter=6,
         leading=14
     ))
@@ -74,7 +112,7 @@ def create_custom_styles():
         name='BulletPoint',
         parent=styles['Normal'],
         fontSize=10,
-        textColor=TEXT_COLOR,
+        textColor=colors["text"],
         leftIndent=20,
         bulletIndent=10,
         spaceAfter=4,
@@ -84,154 +122,154 @@ def create_custom_styles():
     return styles
 
 
-def generate_resume_pdf(resume_data: dict, user_name: str = "Your Name") -> bytes:
+def _scaled_style(style, scale):
+    """Copy of a style with fonts scaled by `scale` and vertical spacing by scale**2."""
+    # Whitespace shrinks faster than text so legibility is given up last
+    spacing = scale * scale
+    return ParagraphStyle(
+        name=style.name,
+        parent=style,
+        fontSize=style.fontSize * scale,
+        leading=style.leading * scale,
+        spaceBefore=style.spaceBefore * spacing,
+        spaceAfter=style.spaceAfter * spacing
+    )
+
+
+@lru_cache(maxsize=256)
+def get_styles(theme: str = "default", scale: float = 1.0):
     """
-    Generate a professional PDF resume from the collected resume data.
+    Return the stylesheet for a theme (and auto-fit scale), built once per process.
+
+    The result is a read-only mapping of style name to ParagraphStyle shared by
+    every render, so callers must not modify the styles themselves.
     """
-    buffer = BytesIO()
-    # Optimized margins for single page
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=LETTER,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.5 * inch,
-        bottomMargin=0.5 * inch
-    )
-    
-    styles = create_custom_styles()
+    if scale != 1.0:
+        return MappingProxyType({
+            name: _scaled_style(style, scale) if isinstance(style, ParagraphStyle) else style
+            for name, style in get_styles(theme).items()
+        })
+    styles = create_custom_styles(theme)
+    return MappingProxyType({name: styles[name] for name in styles.byName})
+
+
+def measure_story_height(story: list, width: float) -> float:
+    """Total height of the flowables when laid out in a frame of the given width."""
+    height = 0.0
+    for flowable in story:
+        _, h = flowable.wrap(width, 1e6)
+        height += h + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+    return height
+
+
+def fit_scale(resume: NormalizedResume, theme: str = "default") -> float:
+    """
+    Largest scale in [FIT_MIN_SCALE, 1] at which the resume fits on one page.
+
+    Binary search over wrap() measurements only (no doc.build), cached per content hash.
+    """
+    key = (TEMPLATE_VERSION, theme, resume.content_hash)
+    cached = _fit_cache.get(key)
+    if cached is not None:
+        return cached
+
+    doc = _new_document(BytesIO())
+    # Frames pad their content by 6pt on every side
+    width, height = doc.width - 12, doc.height - 12
+
+    def fits(scale):
+        story = build_resume_story(resume, get_styles(theme, scale), theme)
+        return measure_story_height(story, width) <= height
+
+    if fits(1.0):
+        scale = 1.0
+    elif not fits(FIT_MIN_SCALE):
+        # Too long even at the smallest legible size; it spills onto a second page anyway,
+        # so keep it at full size rather than shrunken across two pages
+        scale = 1.0
+    else:
+        low, high = FIT_MIN_SCALE, 1.0
+        while high - low > FIT_PRECISION:
+            mid = round((low + high) / 2, 3)
+            if fits(mid):
+                low = mid
+            else:
+                high = mid
+        scale = low
+
+    _fit_cache.set(key, scale)
+    return scale
+
+
+def build_resume_story(resume: NormalizedResume, styles, theme: str = "default") -> list:
+    """
+    Build the list of flowables making up the resume.
+    """
+    # Paragraph text is mini-markup, so user content is escaped
+    esc = lambda text: escape(text, quote=False)
     story = []
     
     # =====================
     # HEADER SECTION
     # =====================
-    story.append(Paragraph(user_name, styles['ResumeHeader']))
+    story.append(Paragraph(esc(resume.name), styles['ResumeHeader']))
     
     # Contact Information
-    contact = resume_data.get("contact", {})
-    contact_parts = []
-    
-    if contact.get("phone"):
-        contact_parts.append(contact["phone"])
-    if contact.get("email"): # Ensure email is included
-        contact_parts.append(contact["email"])
-    if contact.get("address"):
-        address_line = contact["address"].split('\n')[0]
-        contact_parts.append(address_line)
-    
-    if contact_parts:
-        story.append(Paragraph(" • ".join(contact_parts), styles['ContactInfo']))
+    if resume.contact:
+        story.append(Paragraph(" • ".join(map(esc, resume.contact)), styles['ContactInfo']))
     
     # Professional Links
-    links = []
-    if contact.get("linkedin"):
-        links.append(f"LinkedIn: {contact['linkedin']}")
-    if contact.get("github"):
-        links.append(f"GitHub: {contact['github']}")
-    if contact.get("portfolio"):
-        links.append(f"Portfolio: {contact['portfolio']}")
-    
-    if links:
-        story.append(Paragraph(" | ".join(links), styles['ContactInfo']))
+    if resume.links:
+        story.append(Paragraph(" | ".join(map(esc, resume.links)), styles['ContactInfo']))
     
-    story.append(HRFlowable(width="100%", thickness=1, color=PRIMARY_COLOR, spaceAfter=8, spaceBefore=4))
+    story.append(HRFlowable(width="100%", thickness=1, color=THEMES[theme]["primary"], spaceAfter=8, spaceBefore=4))
     
     # =====================
-    # DYNAMIC STRUCTURE LOGIC
+    # SECTIONS (already ordered by experience level)
     # =====================
-    exp_level = resume_data.get("experience_level", "experienced" if resume_data.get("experience") else "fresher")
-    
-    # Define Section Order based on Experience Level
-    if exp_level == "fresher":
-        # Fresher: Summary -> Projects -> Skills -> Education -> Achievements -> Experience (if any)
-        section_order = ["summary", "projects", "skills", "education", "achievements", "experience"]
-    else:
-        # Experienced: Summary -> Experience -> Projects -> Skills -> Education -> Achievements
-        section_order = ["summary", "experience", "projects", "skills", "education", "achievements"]
-        
-    for section in section_order:
-        
-        # --- SUMMARY ---
-        if section == "summary":
-            # Check for structured summary first, then raw_notes fallback
-            summary_text = resume_data.get("summary", "")
-            if not summary_text:
-                raw_notes = resume_data.get("raw_notes", [])
-                if raw_notes:
-                    summary_text = " ".join(raw_notes[:2]) # Fallback
-            
-            if summary_text:
-                story.append(Paragraph("PROFESSIONAL SUMMARY", styles['SectionHeader']))
-                story.append(Paragraph(summary_text, styles['ResumeContent']))
-                
-        # --- EXPERIENCE ---
-        elif section == "experience":
-            experience = resume_data.get("experience", [])
-            # Also check raw_notes fallback for backward compatibility
-            raw_notes = resume_data.get("raw_notes", [])
-            
-            if experience or (len(raw_notes) > 2):
-                story.append(Paragraph("EXPERIENCE", styles['SectionHeader']))
-                
-                if experience:
-                    for item in experience:
-                         story.append(Paragraph(f"• {item}", styles['BulletPoint']))
-                else: 
-                     # Fallback to raw notes
-                     for note in raw_notes[2:]:
-                        story.append(Paragraph(f"• {note}", styles['BulletPoint']))
-
-        # --- PROJECTS ---
-        elif section == "projects":
-            projects = resume_data.get("projects", [])
-            if projects:
-                story.append(Paragraph("PROJECTS", styles['SectionHeader']))
-                for project in projects:
-                    story.append(Paragraph(f"• {project}", styles['BulletPoint']))
-
-        # --- SKILLS ---
-        elif section == "skills":
-            skills = resume_data.get("skills", [])
-            if skills:
-                story.append(Paragraph("SKILLS", styles['SectionHeader']))
-                
-                if isinstance(skills, dict):
-                    # Categorized Skills: "Category: Skill, Skill"
-                    for category, skill_list in skills.items():
-                        if isinstance(skill_list, list):
-                            text = f"<b>{category}:</b> {', '.join(skill_list)}"
-                        else:
-                            text = f"<b>{category}:</b> {str(skill_list)}"
-                        story.append(Paragraph(text, styles['BulletPoint']))
-                        
-                elif isinstance(skills, list):
-                    # Flat list
-                    skills_text = " • ".join(skills)
-                    story.append(Paragraph(skills_text, styles['ResumeContent']))
-                else:
-                    # String fallback
-                    story.append(Paragraph(str(skills), styles['ResumeContent']))
-
-        # --- EDUCATION ---
-        elif section == "education":
-            education = resume_data.get("education", [])
-            if education:
-                 story.append(Paragraph("EDUCATION", styles['SectionHeader']))
-                 if isinstance(education, list):
-                     for edu in education:
-                         story.append(Paragraph(edu, styles['ResumeContent']))
-                 elif isinstance(education, str):
-                     for entry in education.split('\n'):
-                         if entry.strip():
-                             story.append(Paragraph(entry.strip(), styles['ResumeContent']))
-
-        # --- ACHIEVEMENTS ---
-        elif section == "achievements":
-            achievements = resume_data.get("achievements", [])
-            if achievements:
-                story.append(Paragraph("ACHIEVEMENTS", styles['SectionHeader']))
-                for ach in achievements:
-                    story.append(Paragraph(f"• {ach}", styles['BulletPoint']))
+    for section in resume.sections:
+        story.append(Paragraph(section.title.upper(), styles['SectionHeader']))
+
+        if section.kind == "paragraph":
+            story.append(Paragraph(esc(section.items[0]), styles['ResumeContent']))
+        elif section.kind == "bullets":
+            for item in section.items:
+                story.append(Paragraph(f"• {esc(item)}", styles['BulletPoint']))
+        elif section.kind == "labeled":
+            for label, text in section.items:
+                story.append(Paragraph(f"<b>{esc(label)}:</b> {esc(text)}", styles['BulletPoint']))
+        else:
+            for line in section.items:
+                story.append(Paragraph(esc(line), styles['ResumeContent']))
+
+    return story
+
+
+def _new_document(buffer):
+    # Optimized margins for single page
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=LETTER,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch
+    )
+
+
+def generate_resume_pdf(resume_data: dict, user_name: str = "Your Name", theme: str = "default", fit_to_page: bool = False) -> bytes:
+    """
+    Generate a professional PDF resume from the collected resume data.
+
+    With fit_to_page, fonts and spacing are scaled down just enough for the
+    resume to fit on a single page (see fit_scale).
+    """
+    buffer = BytesIO()
+    doc = _new_document(buffer)
+
+    resume = normalize_resume(resume_data, user_name)
+    scale = fit_scale(resume, theme) if fit_to_page else 1.0
+    story = build_resume_story(resume, get_styles(theme, scale), theme)
     
     # Build PDF
     doc.build(story)
@@ -241,6 +279,69 @@ def generate_resume_pdf(resume_data: dict, user_name: str = "Your Name") -> byte
     return pdf_bytes
 
 
+class PDFCache:
+    """Byte-bounded LRU of rendered PDFs with optional on-disk spill."""
+
+    def __init__(self, max_bytes=PDF_CACHE_MAX_BYTES, spill_dir=PDF_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pdf")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.spill_dir and os.path.exists(self._spill_path(key)):
+            with open(self._spill_path(key), "rb") as f:
+                pdf_bytes = f.read()
+            self.set(key, pdf_bytes)
+            return pdf_bytes
+        return None
+
+    def set(self, key, pdf_bytes):
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = pdf_bytes
+            self.size += len(pdf_bytes)
+            while self.size > self.max_bytes and self._entries:
+                old_key, old_bytes = self._entries.popitem(last=False)
+                self.size -= len(old_bytes)
+                evicted.append((old_key, old_bytes))
+        if self.spill_dir:
+            for old_key, old_bytes in evicted:
+                path = self._spill_path(old_key)
+                if not os.path.exists(path):
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(old_bytes)
+                    os.replace(tmp_path, path)
+
+
+pdf_cache = PDFCache()
+
+
+def render_resume_pdf(resume_data: dict, user_name: str = "Your Name") -> bytes:
+    """
+    Return the PDF for this resume, building it only once per distinct content.
+    """
+    key = canonical_hash(TEMPLATE_VERSION, PDF_FIT_SINGLE_PAGE, normalize_resume(resume_data, user_name).content_hash)
+    pdf_bytes = pdf_cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = generate_resume_pdf(resume_data, user_name, fit_to_page=PDF_FIT_SINGLE_PAGE)
+        pdf_cache.set(key, pdf_bytes)
+    return pdf_bytes
+
+
 def get_pdf_download_data(resume_data: dict, user_name: str = "Your Name") -> tuple:
     """
     Generate PDF and return data suitable for Streamlit download button.
@@ -252,11 +353,95 @@ def get_pdf_download_data(resume_data: dict, user_name: str = "Your Name") -> tu
     Returns:
         tuple: (pdf_bytes, filename, mime_type)
     """
-    pdf_bytes = generate_resume_pdf(resume_data, user_name)
-    
-    # Sanitize filename
+    pdf_bytes = render_resume_pdf(resume_data, user_name)
+    return pdf_bytes, resume_filename(user_name), "application/pdf"
+
+
+def resume_filename(user_name: str) -> str:
+    """Sanitized download filename for a user's resume."""
     safe_name = "".join(c for c in user_name if c.isalnum() or c in (' ', '_')).rstrip()
     safe_name = safe_name.replace(' ', '_')
-    filename = f"{safe_name}_Resume.pdf"
-    
-    return pdf_bytes, filename, "application/pdf"
+    return f"{safe_name}_Resume.pdf"
+
+
+def _load_export_item(item):
+    """Resolve a batch item to (resume_data, user_name).
+
+    Items are resume_data dicts, (resume_data, user_name) tuples or session IDs.
+    """
+    if isinstance(item, dict):
+        return item, "Your Name"
+    if isinstance(item, tuple):
+        return item
+    from core.database import db
+    session = db.get_session(item)
+    if not session:
+        raise ValueError(f"Session {item} not found")
+    user = db.get_user(session["email"]) or {}
+    return session.get("resume_data", {}), user.get("name", "Your Name")
+
+
+def _render_export_job(job):
+    """Process pool worker: render one resume."""
+    index, resume_data, user_name = job
+    return index, user_name, generate_resume_pdf(resume_data, user_name, fit_to_page=PDF_FIT_SINGLE_PAGE)
+
+
+def export_resumes_zip(items, zip_path: str, max_workers: int = None) -> dict:
+    """
+    Render many resumes across a process pool and stream them into a ZIP file.
+
+    Args:
+        items: Iterable of resume_data dicts, (resume_data, user_name) tuples or session IDs
+        zip_path: Where to write the archive
+        max_workers: Worker processes (defaults to the number of cores)
+
+    Returns:
+        dict: exported count, failures as (position, error) pairs, elapsed seconds and resumes/sec
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    # Only a couple of jobs per worker are in flight, so memory stays flat however many items there are
+    window = 2 * max_workers
+    exported, failures = 0, []
+    start = time.perf_counter()
+
+    # Spawned workers do not inherit the parent's Mongo client, event loop or other threads
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool, \
+            zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        pending = set()
+
+        def drain(block_until):
+            nonlocal exported, pending
+            done, pending = wait(pending, return_when=block_until)
+            for future in done:
+                try:
+                    index, user_name, pdf_bytes = future.result()
+                except Exception as e:
+                    failures.append((getattr(future, "position", None), str(e)))
+                    continue
+                # PDFs are already compressed, so they are stored as-is
+                archive.writestr(f"{index:05d}_{resume_filename(user_name)}", pdf_bytes)
+                exported += 1
+
+        for position, item in enumerate(items):
+            try:
+                resume_data, user_name = _load_export_item(item)
+            except Exception as e:
+                failures.append((position, str(e)))
+                continue
+            future = pool.submit(_render_export_job, (position, resume_data, user_name))
+            future.position = position
+            pending.add(future)
+            if len(pending) >= window:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "exported": exported,
+        "failed": failures,
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(exported / elapsed, 2) if elapsed else 0.0
+    }
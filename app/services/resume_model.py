@@ -0,0 +1,130 @@
+"""Normalized Resume Model
+
+Both the live preview and the PDF generator render from this model, so section
+ordering, the raw_notes fallback and the different shapes `skills` and
+`education` can take are resolved in one place, once per resume_data change.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+from core.hashing import canonical_hash
+from core.lru import LRUCache
+
+MODEL_CACHE_SIZE = 256
+
+# Section order by experience level
+FRESHER_ORDER = ("summary", "projects", "skills", "education", "achievements", "experience")
+EXPERIENCED_ORDER = ("summary", "experience", "projects", "skills", "education", "achievements")
+
+SECTION_TITLES = {
+    "summary": "Professional Summary",
+    "experience": "Experience",
+    "projects": "Projects",
+    "skills": "Skills",
+    "education": "Education",
+    "achievements": "Achievements",
+}
+
+
+@dataclass(frozen=True)
+class ResumeSection:
+    """One rendered section.
+
+    kind is "paragraph" (items holds one text), "bullets", "lines" (one line
+    per item) or "labeled" (items are (label, text) pairs).
+    """
+    key: str
+    title: str
+    kind: str
+    items: Tuple
+
+
+@dataclass(frozen=True)
+class NormalizedResume:
+    name: str
+    contact: Tuple[str, ...]
+    links: Tuple[str, ...]
+    sections: Tuple[ResumeSection, ...]
+    content_hash: str
+
+
+def _section(resume_data, key):
+    raw_notes = resume_data.get("raw_notes") or []
+    title = SECTION_TITLES[key]
+
+    if key == "summary":
+        # Structured summary first, then raw_notes fallback
+        text = resume_data.get("summary") or " ".join(map(str, raw_notes[:2]))
+        return ResumeSection(key, title, "paragraph", (text,)) if text else None
+
+    if key == "experience":
+        experience = resume_data.get("experience") or []
+        # raw_notes beyond the two used for the summary stand in for experience
+        items = experience or (raw_notes[2:] if len(raw_notes) > 2 else [])
+        return ResumeSection(key, title, "bullets", tuple(map(str, items))) if items else None
+
+    if key == "skills":
+        skills = resume_data.get("skills")
+        if not skills:
+            return None
+        if isinstance(skills, dict):
+            # Categorized Skills: "Category: Skill, Skill"
+            pairs = tuple(
+                (str(category), ", ".join(map(str, value)) if isinstance(value, list) else str(value))
+                for category, value in skills.items()
+            )
+            return ResumeSection(key, title, "labeled", pairs)
+        text = " • ".join(map(str, skills)) if isinstance(skills, list) else str(skills)
+        return ResumeSection(key, title, "paragraph", (text,))
+
+    if key == "education":
+        education = resume_data.get("education")
+        if not education:
+            return None
+        if isinstance(education, list):
+            lines = tuple(map(str, education))
+        else:
+            lines = tuple(line.strip() for line in str(education).split("\n") if line.strip())
+        return ResumeSection(key, title, "lines", lines) if lines else None
+
+    # projects, achievements
+    items = resume_data.get(key) or []
+    return ResumeSection(key, title, "bullets", tuple(map(str, items))) if items else None
+
+
+def _normalize(resume_data, user_name, content_hash):
+    contact = resume_data.get("contact") or {}
+    contact_parts = [contact.get("phone"), contact.get("email")]
+    if contact.get("address"):
+        contact_parts.append(contact["address"].split("\n")[0])
+
+    links = []
+    for label, field in (("LinkedIn", "linkedin"), ("GitHub", "github"), ("Portfolio", "portfolio")):
+        if contact.get(field):
+            links.append(f"{label}: {contact[field]}")
+
+    exp_level = resume_data.get("experience_level", "experienced" if resume_data.get("experience") else "fresher")
+    order = FRESHER_ORDER if exp_level == "fresher" else EXPERIENCED_ORDER
+    sections = tuple(s for s in (_section(resume_data, key) for key in order) if s)
+
+    return NormalizedResume(
+        name=user_name,
+        contact=tuple(str(p) for p in contact_parts if p),
+        links=tuple(links),
+        sections=sections,
+        content_hash=content_hash,
+    )
+
+
+_model_cache = LRUCache(maxsize=MODEL_CACHE_SIZE)
+
+
+def normalize_resume(resume_data: dict, user_name: str = "Your Name") -> NormalizedResume:
+    """Return the normalized model for resume_data, memoized on its content hash."""
+    content_hash = canonical_hash(user_name, resume_data)
+    model = _model_cache.get(content_hash)
+    if model is None:
+        model = _normalize(resume_data, user_name, content_hash)
+        _model_cache.set(content_hash, model)
+    return model
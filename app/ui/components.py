@@ -1,5 +1,10 @@
+import html
+
 import streamlit as st
 
+from core.lru import LRUCache
+from services.resume_model import normalize_resume
+
 # ====================
 # DESIGN SYSTEM
 # ====================
@@ -257,19 +262,27 @@ def session_card(session, on_click_key):
     """Renders a single session as a styled card."""
     job_desc = session.get('job_description', '')
     preview_text = job_desc[:80] + "..." if len(job_desc) > 80 else job_desc
+
+    meta = []
+    if session.get('created_at'):
+        meta.append(session['created_at'].strftime("%b %d, %Y"))
+    if session.get('ats_score') is not None:
+        meta.append(f"ATS {session['ats_score']}%")
+    meta_html = f'<p style="color: #a0a0a0; font-size: 0.8rem; margin: 0;">{" • ".join(meta)}</p>' if meta else ""
     
     with st.container():
         st.markdown(f"""
         <div class="card-container">
             <p style="color: #a0a0a0; font-size: 0.85rem; margin-bottom: 8px;">JOB DESCRIPTION</p>
             <p style="color: #e0e0e0; font-size: 1rem; margin-bottom: 16px;">{preview_text}</p>
+            {meta_html}
         </div>
         """, unsafe_allow_html=True)
         if st.button("➡️ Continue", key=on_click_key):
             return True
     return False
 
-def ats_score_card(score, feedback):
+def ats_score_card(score, feedback, source=None):
     """Renders an ATS score display with visual gauge."""
     # Determine color based on score
     if score >= 85:
@@ -311,7 +324,57 @@ def ats_score_card(score, feedback):
     </div>
     """, unsafe_allow_html=True)
 
+    if source == "local":
+        st.caption("⚡ Instant keyword match score")
+    elif source == "llm":
+        st.caption("🤖 Full AI scan score")
+
     if feedback:
         with st.expander("💡 Improvement Tips", expanded=False):
             for item in feedback:
                 st.markdown(f"- {item}")
+
+# ====================
+# RESUME PREVIEW
+# ====================
+PREVIEW_CACHE_SIZE = 256
+_preview_cache = LRUCache(maxsize=PREVIEW_CACHE_SIZE)
+
+def _build_preview_html(resume):
+    esc = lambda value: html.escape(str(value))
+    parts = ["<div class='resume-paper'>"]
+
+    # Header
+    parts.append(f"<h2 style='color: #333 !important; text-align: center; margin-bottom: 5px;'>{esc(resume.name)}</h2>")
+    if resume.contact:
+        parts.append(f"<p style='color: #666 !important; text-align: center; font-size: 0.9rem;'>{' • '.join(map(esc, resume.contact))}</p>")
+    if resume.links:
+        parts.append(f"<p style='color: #666 !important; text-align: center; font-size: 0.8rem;'>{' | '.join(map(esc, resume.links))}</p>")
+    parts.append("<hr style='border-color: #ccc;'>")
+
+    # Sections, in the same order and with the same fallbacks as the PDF
+    for section in resume.sections:
+        parts.append(f"<h4 style='color: #333 !important;'>{esc(section.title)}</h4>")
+        if section.kind == "paragraph":
+            parts.append(f"<p style='color: #444 !important;'>{esc(section.items[0])}</p>")
+        elif section.kind == "bullets":
+            bullets = "".join(f"<li style='color: #444 !important;'>{esc(item)}</li>" for item in section.items)
+            parts.append(f"<ul>{bullets}</ul>")
+        elif section.kind == "labeled":
+            for label, text in section.items:
+                parts.append(f"<p style='color: #444 !important; margin-bottom: 2px;'><b>{esc(label)}:</b> {esc(text)}</p>")
+        else:
+            for line in section.items:
+                parts.append(f"<p style='color: #444 !important;'>{esc(line)}</p>")
+
+    parts.append("</div>")
+    return "".join(parts)
+
+def resume_preview_html(resume_data, user_name):
+    """Returns the live preview as one HTML fragment, memoized on the content hash."""
+    resume = normalize_resume(resume_data, user_name)
+    fragment = _preview_cache.get(resume.content_hash)
+    if fragment is None:
+        fragment = _build_preview_html(resume)
+        _preview_cache.set(resume.content_hash, fragment)
+    return fragment
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+# Application modules import each other relative to the app/ directory (as under `streamlit run app/main.py`)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app')))
+
+# The Gemini client validates its key at import time; tests never reach the API
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+# Canned answers per chain; tests override entries on the fixture
+LLM_RESPONSES = {
+    "interview": "Which metrics did that project move?",
+    "smart_content": {"section": "projects", "content": ["Built a queue"], "experience_level_update": None, "feedback": "ok"},
+    "ats": {"score": 81, "feedback": ["Add Kafka"], "missing_keywords": ["kafka"]},
+    "summary": "Backend engineer focused on Python services.",
+    "conversation_summary": "Candidate described a queue project.",
+    "fused_turn": {
+        "section": "projects", "content": ["Built a queue"], "experience_level_update": None,
+        "summary": "Backend engineer focused on Python services.",
+        "ats_score": 81, "ats_feedback": ["Add Kafka"], "missing_keywords": ["kafka"],
+        "next_question": "Which metrics did that project move?",
+    },
+}
+
+
+class FakeLLM:
+    """Stands in for the cached LLM round-trip and records (chain, prompt tokens) per call.
+
+    A response may be a callable, called with the chain's inputs.
+    """
+
+    def __init__(self):
+        from agents import agents
+        self.prompts = {name: getattr(agents, f"{name}_prompt") for name in LLM_RESPONSES}
+        self.responses = dict(LLM_RESPONSES)
+        self.calls = []
+
+    def tokens(self, name):
+        return [tokens for chain, tokens in self.calls if chain == name]
+
+    def __call__(self, name, chain, inputs, use_cache=True):
+        from agents.prompt_packing import estimate_tokens, pack_inputs
+        self.calls.append((name, estimate_tokens(self.prompts[name].format(**pack_inputs(name, inputs)))))
+        response = self.responses[name]
+        return response(inputs) if callable(response) else response
+
+
+class CountingCollection:
+    """Proxies a collection, recording the projection of every find_one."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.projections = []
+
+    @property
+    def reads(self):
+        return len(self.projections)
+
+    def find_one(self, filter=None, projection=None, *args, **kwargs):
+        self.projections.append(projection)
+        return self.collection.find_one(filter, projection, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Replaces agents._cached_invoke and _acached_invoke with a FakeLLM."""
+    from agents import agents
+    fake = FakeLLM()
+
+    async def acached_invoke(name, chain, inputs, use_cache=True):
+        return fake(name, chain, inputs, use_cache)
+
+    monkeypatch.setattr(agents, "_cached_invoke", fake)
+    monkeypatch.setattr(agents, "_acached_invoke", acached_invoke)
+    return fake
@@ -0,0 +1,40 @@
+from agents.ats_local import build_keyword_index, score_resume, tokenize
+
+JOB_DESCRIPTION = """
+Backend Engineer. We need strong Python and Django experience, REST API design,
+PostgreSQL, Docker and Kubernetes. Experience with machine learning pipelines is a plus.
+Python services run on Kubernetes.
+"""
+
+
+def test_synonyms_are_folded():
+    assert tokenize("JS, k8s and Postgres") == ["javascript", "kubernetes", "and", "postgresql"]
+
+
+def test_index_drops_stopwords_and_weights_repeats():
+    index = build_keyword_index(JOB_DESCRIPTION)
+    assert "the" not in index.weights and "experience" not in index.weights
+    assert index.weights["python"] == 2
+    assert index.weights["kubernetes"] == 2
+
+
+def test_score_is_deterministic_and_reports_missing_keywords():
+    resume_data = {
+        "summary": "Backend developer",
+        "skills": ["Python", "Django", "Postgres", "k8s"],
+        "projects": ["Built a REST API with ML model serving"],
+        "education": "B.Tech",
+    }
+    first = score_resume(JOB_DESCRIPTION, resume_data)
+    assert first == score_resume(JOB_DESCRIPTION, resume_data)
+    assert "python" not in first["missing_keywords"]
+    assert "docker" in first["missing_keywords"]
+
+    resume_data["skills"].append("Docker")
+    assert score_resume(JOB_DESCRIPTION, resume_data)["score"] > first["score"]
+
+
+def test_empty_resume_scores_low():
+    result = score_resume(JOB_DESCRIPTION, {"raw_notes": []})
+    assert result["score"] < 10
+    assert any("summary" in tip for tip in result["feedback"])
@@ -0,0 +1,65 @@
+from agents import graph
+from agents.graph import ats_node
+
+JOB_DESCRIPTION = "Backend engineer with Python, Django, PostgreSQL and Docker."
+RESUME = {"skills": ["Python", "Django", "PostgreSQL", "Docker"], "projects": ["Django API on PostgreSQL"]}
+
+
+def state(**extra):
+    return {"job_description": JOB_DESCRIPTION, "resume_data": dict(RESUME), **extra}
+
+
+def test_failed_llm_scan_keeps_the_local_score(monkeypatch):
+    def fail(job_description, resume_data):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(graph, "calculate_ats_score", fail)
+    monkeypatch.setattr(graph, "ATS_LLM_THRESHOLD", 0)
+    update = ats_node(state(ats_llm_requested=True))
+    assert update["ats_source"] == "local" and not update["ats_llm_requested"]
+    assert update["ats_score"] > 0 and update["ats_fingerprint"]
+
+
+def scanned(state_, update):
+    """The state after a turn applied update."""
+    return {**state_, **update}
+
+
+def test_unchanged_fingerprint_skips_the_scan():
+    first, run_llm = graph.plan_ats_scan(state())
+    assert first["ats_source"] == "local" and first["ats_pending_changes"] == 1
+    update, run_llm = graph.plan_ats_scan(scanned(state(), first))
+    assert update == {} and not run_llm
+
+
+def test_raw_notes_do_not_change_the_fingerprint():
+    base = graph.ats_fingerprint(JOB_DESCRIPTION, RESUME)
+    assert graph.ats_fingerprint(JOB_DESCRIPTION, {**RESUME, "raw_notes": ["unparsed answer"]}) == base
+    assert graph.ats_fingerprint(JOB_DESCRIPTION, {**RESUME, "skills": RESUME["skills"] + ["Kafka"]}) != base
+
+    first, _ = graph.plan_ats_scan(state())
+    noted = scanned(state(), first)
+    noted["resume_data"] = {**RESUME, "raw_notes": ["unparsed answer"]}
+    assert graph.plan_ats_scan(noted) == ({}, False)
+
+
+def test_llm_rescan_waits_for_ats_rescore_every_changes(monkeypatch):
+    monkeypatch.setattr(graph, "ATS_LLM_THRESHOLD", 0)
+    monkeypatch.setattr(graph, "ATS_RESCORE_EVERY", 3)
+    current = state()
+    update, run_llm = graph.plan_ats_scan(current)
+    assert run_llm
+    current = scanned(current, graph.apply_llm_ats_result(update, {"score": 90, "feedback": []}))
+
+    for change in range(1, 3):
+        current["resume_data"] = {**current["resume_data"], "skills": current["resume_data"]["skills"] + [f"Tool{change}"]}
+        update, run_llm = graph.plan_ats_scan(current)
+        # Deferred: only the fingerprint and counter move, the LLM score stays
+        assert not run_llm and set(update) == {"ats_fingerprint", "ats_pending_changes"}
+        assert update["ats_pending_changes"] == change
+        current = scanned(current, update)
+    assert current["ats_score"] == 90 and current["ats_source"] == "llm"
+
+    current["resume_data"] = {**current["resume_data"], "skills": current["resume_data"]["skills"] + ["Tool3"]}
+    update, run_llm = graph.plan_ats_scan(current)
+    assert run_llm and update["ats_pending_changes"] == 3
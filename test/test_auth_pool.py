@@ -0,0 +1,41 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from core.auth import BcryptPool, bcrypt_cost
+
+# Low cost keeps the suite fast; logins/sec scales by 2**(12 - BENCH_ROUNDS) down to production cost
+BENCH_ROUNDS = 4
+
+
+def test_pool_hashes_and_reports_metrics():
+    pool = BcryptPool(workers=2, max_queue=4)
+    hashed = pool.run(bcrypt.hashpw, b"secret", bcrypt.gensalt(rounds=BENCH_ROUNDS))
+    assert bcrypt_cost(hashed.decode()) == BENCH_ROUNDS
+    assert pool.run(bcrypt.checkpw, b"secret", hashed)
+    assert not pool.run(bcrypt.checkpw, b"wrong", hashed)
+
+    metrics = pool.metrics()
+    assert metrics["completed"] == 3
+    assert metrics["queue_depth"] == 0 and metrics["running"] == 0
+
+
+def test_login_throughput_per_core():
+    """Benchmark: concurrent verifications through the pool, reported as logins/sec per core."""
+    cores = os.cpu_count() or 1
+    pool = BcryptPool(workers=cores, max_queue=256)
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=BENCH_ROUNDS))
+    logins = 64 * cores
+
+    start = time.perf_counter()
+    # Simulates many Streamlit script threads logging in at once
+    with ThreadPoolExecutor(max_workers=32) as callers:
+        results = list(callers.map(lambda _: pool.run(bcrypt.checkpw, b"secret", hashed), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    per_core = logins / elapsed / cores
+    print(f"\nbcrypt cost {BENCH_ROUNDS}: {per_core:.0f} logins/sec per core "
+          f"(~{per_core / 2 ** (12 - BENCH_ROUNDS):.1f} at cost 12) on {cores} cores")
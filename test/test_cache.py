@@ -0,0 +1,38 @@
+from agents.cache import ResponseCache, LRUCacheTier
+
+
+def test_identical_inputs_hit_cache():
+    cache = ResponseCache([LRUCacheTier(maxsize=8)])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"score": 70, "feedback": ["Add metrics"]}
+
+    inputs = {"job_description": "Python dev", "resume_data": {"skills": ["Python"]}}
+    first = cache.get_or_compute("ats", inputs, compute)
+    # Same content, different key order
+    second = cache.get_or_compute("ats", {"resume_data": {"skills": ["Python"]}, "job_description": "Python dev"}, compute)
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats["ats"] == {"hits": 1, "misses": 1, "bypassed": 0}
+
+
+def test_bypass_and_eviction():
+    cache = ResponseCache([LRUCacheTier(maxsize=1)])
+    cache.get_or_compute("q", {"n": 1}, lambda: "one")
+    cache.get_or_compute("q", {"n": 2}, lambda: "two")
+    assert cache.get_or_compute("q", {"n": 1}, lambda: "again") == "again"
+    assert cache.get_or_compute("q", {"n": 1}, lambda: "fresh", use_cache=False) == "fresh"
+    assert cache.stats["q"]["bypassed"] == 1
+
+
+def test_shared_tier_backfills_local_tier():
+    local, shared = LRUCacheTier(maxsize=8), LRUCacheTier(maxsize=8)
+    cache = ResponseCache([local, shared])
+    key = cache.make_key("summary", {"x": 1})
+    shared.set(key, "cached summary")
+
+    assert cache.get_or_compute("summary", {"x": 1}, lambda: "new") == "cached summary"
+    assert local.get(key) == "cached summary"
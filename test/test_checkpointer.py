@@ -0,0 +1,53 @@
+import asyncio
+
+import mongomock
+import pytest
+
+from agents import graph
+from agents.checkpointer import MongoSaver
+from agents.graph import _turn_args, load_session_state, workflows
+from conftest import CountingCollection
+
+
+@pytest.fixture
+def collection(fake_llm):
+    return mongomock.MongoClient().db.graph_checkpoints
+
+
+def state(response):
+    return {
+        "job_description": "Backend engineer",
+        "resume_data": {"skills": ["Python"]},
+        "history": ["AI: stale copy held by the UI"],
+        "user_last_response": response,
+    }
+
+
+def test_turns_accumulate_and_resume_from_one_read(collection, monkeypatch):
+    compiled = workflows[("graph", False)].compile(checkpointer=MongoSaver(collection))
+    for response in ("I built a queue", "It handles 2k jobs/sec"):
+        turn_input, config = _turn_args(state(response), "session-1")
+        result = compiled.invoke(turn_input, config)
+    assert result["history"] == [
+        "User: I built a queue", "AI: Which metrics did that project move?",
+        "User: It handles 2k jobs/sec", "AI: Which metrics did that project move?",
+    ]
+    assert collection.count_documents({}) == 1
+
+    # A fresh process (or another replica) restores the session with one indexed read
+    counting = CountingCollection(collection)
+    restored = workflows[("graph", True)].compile(checkpointer=MongoSaver(counting))
+    monkeypatch.setattr(graph, "_checkpointed_app", lambda turn_mode, use_async: restored)
+    values = load_session_state("session-1")
+    assert counting.reads == 1
+    assert values["history"] == result["history"]
+    assert values["ats_score"] == result["ats_score"] and values["resume_version"] == 2
+    assert load_session_state("unknown-session") is None
+
+
+def test_async_saver_round_trip(collection):
+    compiled = workflows[("graph", True)].compile(checkpointer=MongoSaver(collection))
+    turn_input, config = _turn_args(state("I built a queue"), "session-2")
+    result = asyncio.run(compiled.ainvoke(turn_input, config))
+    snapshot = asyncio.run(compiled.aget_state(config))
+    assert snapshot.values["history"] == result["history"] == ["User: I built a queue", "AI: Which metrics did that project move?"]
@@ -0,0 +1,42 @@
+from services.completeness import completeness_for_state, count_skills, evaluate_completeness
+
+
+def test_fresher_blockers_and_counts():
+    report = evaluate_completeness({
+        "contact": {"phone": "555", "email": None},
+        "education": "B.Tech",
+        "projects": ["A"],
+        "skills": {"Languages": ["Python", "Go"], "Tools": "Git, Docker"},
+        "achievements": ["Won a hackathon"],
+    })
+    assert report["missing"] == [
+        "Email Address",
+        "Professional Summary",
+        "Projects (Need 2 more)",
+        "Achievements (Optional - but need >= 2 if included)",
+    ]
+    assert report["missing_sections"] == ["contact", "summary", "projects", "achievements"]
+    assert (report["project_count"], report["skill_count"]) == (1, 4)
+    assert not report["is_complete"]
+
+
+def test_experienced_track_only_needs_experience():
+    report = evaluate_completeness({
+        "contact": {"phone": "555", "email": "a@b.c"},
+        "summary": "Engineer",
+        "education": "B.Tech",
+        "experience_level": "experienced",
+        "experience": ["Led a team"],
+    })
+    assert report["is_complete"] and report["track"] == "experienced"
+
+
+def test_cached_report_is_reused_until_version_changes():
+    state = {"resume_data": {"skills": ["a", "b", "c"]}, "resume_version": 2}
+    report = completeness_for_state(state)
+    state["completeness"] = report
+    assert completeness_for_state(state) is report
+
+    state["resume_version"] = 3
+    assert completeness_for_state(state)["version"] == 3
+    assert count_skills(None) == 0
@@ -0,0 +1,55 @@
+import os
+from types import SimpleNamespace
+
+from core.database import ConnectionManager, Database, PoolMetricsListener, client_options
+
+
+class FakeClient(dict):
+    created = []
+
+    def __init__(self, uri, event_listeners=None, **options):
+        super().__init__()
+        self.uri, self.options, self.closed = uri, options, False
+        FakeClient.created.append(self)
+
+    def __missing__(self, name):
+        return SimpleNamespace(users=f"{name}.users")
+
+    def close(self):
+        self.closed = True
+
+
+def test_client_is_created_lazily_and_again_after_fork(monkeypatch):
+    FakeClient.created.clear()
+    manager = ConnectionManager("mongodb://example", "app", client_factory=FakeClient, maxPoolSize=5)
+    db = Database(manager)
+    assert FakeClient.created == []
+
+    assert db.users == "app.users"
+    assert db.client is FakeClient.created[0] and len(FakeClient.created) == 1
+    assert FakeClient.created[0].options == {"maxPoolSize": 5}
+
+    # A forked child must not reuse the parent's sockets
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert db.client is FakeClient.created[1]
+    manager._after_fork()
+    assert manager._client is None
+
+
+def test_options_from_config():
+    options = client_options()
+    assert options["connect"] is False
+    assert options["maxPoolSize"] > 0 and options["waitQueueTimeoutMS"] > 0
+
+
+def test_pool_metrics():
+    listener = PoolMetricsListener()
+    listener.connection_created(None)
+    for wait in (0.002, 0.004):
+        listener.connection_checked_out(SimpleNamespace(duration=wait))
+    listener.connection_checked_in(None)
+    listener.connection_check_out_failed(None)
+    assert listener.snapshot() == {
+        "open": 1, "checked_out": 1, "max_checked_out": 2, "checkouts": 2,
+        "checkout_failures": 1, "avg_wait_ms": 3.0, "max_wait_ms": 4.0,
+    }
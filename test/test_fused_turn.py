@@ -0,0 +1,44 @@
+import pytest
+
+from agents import graph
+from agents.graph import app, fused_app
+
+
+@pytest.fixture
+def llm(fake_llm, monkeypatch):
+    # Every turn takes the LLM ATS scan, the worst case for the multi-call graph
+    monkeypatch.setattr(graph, "ATS_LLM_THRESHOLD", 0)
+    return fake_llm
+
+
+def initial_state():
+    return {
+        "job_description": "Backend engineer with Python, Kafka and MongoDB. " * 10,
+        "resume_data": {"skills": ["Python", "MongoDB"], "education": "B.Tech"},
+        "history": [],
+        "user_last_response": "I built a job queue in Python that handles 2k jobs/sec.",
+    }
+
+
+def test_fused_turn_writes_what_the_graph_writes(llm):
+    multi = app.invoke(initial_state())
+    fused = fused_app.invoke(initial_state())
+    for key in ("history", "current_question", "ats_score", "ats_feedback", "ats_source", "resume_version"):
+        assert fused[key] == multi[key], key
+    # The graph leaves the summary to the background queue; the fused call writes it inline
+    assert fused["resume_data"].pop("summary") == llm.responses["summary"]
+    assert fused["resume_data"] == multi["resume_data"]
+
+
+def test_round_trips_and_prompt_tokens_per_turn(llm):
+    """Benchmark: LLM round-trips and total prompt tokens for one turn in each mode."""
+    report = {}
+    for mode, compiled in (("graph", app), ("fused", fused_app)):
+        llm.calls.clear()
+        compiled.invoke(initial_state())
+        report[mode] = (len(llm.calls), sum(tokens for _, tokens in llm.calls))
+
+    print(f"\nround-trips/turn: graph {report['graph'][0]}, fused {report['fused'][0]}; "
+          f"prompt tokens/turn: graph {report['graph'][1]}, fused {report['fused'][1]}")
+    assert report["graph"][0] == 3 and report["fused"][0] == 1
+    assert report["fused"][1] < report["graph"][1] / 2
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from agents.history_summary import HistorySummarizer
+from agents.graph import HISTORY_SUMMARY_BATCH, HISTORY_WINDOW, app, plan_history_summary, recent_history
+
+
+@pytest.fixture
+def llm(fake_llm):
+    """Numbers the interviewer's questions so no two turns repeat."""
+    fake_llm.responses.update({
+        "interview": lambda inputs: f"Tell me more about project {len(fake_llm.tokens('interview'))}, including the metrics you moved?",
+        "conversation_summary": "Candidate shared several backend projects with latency and cost metrics.",
+        "smart_content": {"section": "skills", "content": []},
+        "ats": {"score": 80, "feedback": [], "missing_keywords": []},
+    })
+    return fake_llm
+
+
+def wait_for(summarizer, session_id):
+    deadline = time.monotonic() + 5
+    while summarizer.is_pending(session_id) and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_plan_folds_a_batch_once_the_window_overflows():
+    history = [f"turn {i}" for i in range(HISTORY_WINDOW + HISTORY_SUMMARY_BATCH - 1)]
+    assert plan_history_summary({"history": history}) is None
+
+    history.append("one more")
+    turns, cutoff = plan_history_summary({"history": history})
+    assert turns == history[:HISTORY_SUMMARY_BATCH] and cutoff == HISTORY_SUMMARY_BATCH
+    assert recent_history({"history": history, "summarized_turns": cutoff}) == history[-HISTORY_WINDOW:]
+
+
+def test_prompt_size_stays_flat_over_long_sessions(llm):
+    """Benchmark: interview prompt tokens and graph latency per turn across 60 turns."""
+    state = {
+        "job_description": "Backend engineer with Python and MongoDB",
+        "resume_data": {"skills": ["Python"], "summary": "Engineer"},
+        "history": [],
+        "user_last_response": "",
+    }
+    summarizer = HistorySummarizer()
+    latencies = []
+    for turn in range(60):
+        state["user_last_response"] = f"In project {turn} I cut p99 latency by {turn}% by batching queries."
+        # Same order as the builder: merge the background summary, run the turn, submit the next batch
+        summarizer.merge("s1", state)
+        start = time.perf_counter()
+        state = app.invoke(state)
+        latencies.append(time.perf_counter() - start)
+        summarizer.submit("s1", state)
+        wait_for(summarizer, "s1")
+    summarizer.merge("s1", state)
+
+    assert len(state["history"]) == 120
+    assert state["history_summary"] and state["summarized_turns"] > 100
+    assert len(recent_history(state)) <= HISTORY_WINDOW + HISTORY_SUMMARY_BATCH + 1
+
+    # Once the window fills, prompt size stops growing with the turn count
+    interview_tokens = llm.tokens("interview")
+    steady = interview_tokens[10:]
+    assert max(steady) - min(steady) < 0.25 * min(steady)
+    print(f"\ninterview prompt tokens: turn 1 {interview_tokens[0]}, turn 10 {interview_tokens[9]}, "
+          f"turn 30 {interview_tokens[29]}, turn 60 {interview_tokens[59]}")
+    print(f"graph latency (LLM stubbed): first 10 turns {sum(latencies[:10]) / 10 * 1000:.1f} ms/turn, "
+          f"last 10 turns {sum(latencies[-10:]) / 10 * 1000:.1f} ms/turn")
+
+
+def test_summarizer_runs_one_job_per_session_and_skips_stale_results(fake_llm):
+    history = [f"turn {i}" for i in range(HISTORY_WINDOW + HISTORY_SUMMARY_BATCH)]
+    summarizer = HistorySummarizer()
+    assert not summarizer.submit("s1", {"history": history[:-1]})
+    assert summarizer.submit("s1", {"history": history})
+    wait_for(summarizer, "s1")
+
+    # A state that already folded further keeps its own summary
+    state = {"history": history, "history_summary": "newer", "summarized_turns": HISTORY_SUMMARY_BATCH + 1}
+    assert not summarizer.merge("s1", state) and state["history_summary"] == "newer"
+
+    assert summarizer.submit("s1", {"history": history})
+    wait_for(summarizer, "s1")
+    state = {"history": history}
+    assert summarizer.merge("s1", state) and state["summarized_turns"] == HISTORY_SUMMARY_BATCH
+    assert not summarizer.merge("s1", state)
+
+
+def test_unmerged_results_are_bounded(fake_llm):
+    history = [f"turn {i}" for i in range(HISTORY_WINDOW + HISTORY_SUMMARY_BATCH)]
+    summarizer = HistorySummarizer(max_results=2)
+    for session_id in ("s1", "s2", "s3"):
+        assert summarizer.submit(session_id, {"history": history})
+        wait_for(summarizer, session_id)
+
+    # s1 left without another turn; its result was evicted instead of kept forever
+    assert not summarizer.merge("s1", {"history": history})
+    assert summarizer.merge("s2", {"history": history}) and summarizer.merge("s3", {"history": history})
@@ -0,0 +1,109 @@
+import time
+
+import services.pdf_generator as pdf_generator
+from services.resume_model import normalize_resume
+from services.pdf_generator import PDFCache, create_custom_styles, generate_resume_pdf, get_pdf_download_data, get_styles
+
+RESUME = {
+    "contact": {"phone": "555-0100", "email": "jane@example.com", "address": "Pune\nIndia"},
+    "summary": "Backend engineer focused on Python services.",
+    "projects": ["Built a resume builder with LangGraph", "Shipped a Kubernetes operator", "Wrote a CLI"],
+    "skills": {"Languages": ["Python", "Go"], "Cloud": ["AWS", "Kubernetes"]},
+    "education": "B.Tech Computer Science, 2020",
+}
+
+
+def test_pdf_is_rendered_once_per_distinct_resume(monkeypatch):
+    monkeypatch.setattr(pdf_generator, "pdf_cache", PDFCache(max_bytes=10 * 1024 * 1024))
+    calls = []
+    real_generate = pdf_generator.generate_resume_pdf
+    monkeypatch.setattr(pdf_generator, "generate_resume_pdf", lambda *a, **kw: calls.append(1) or real_generate(*a, **kw))
+
+    pdf_bytes, filename, mime_type = get_pdf_download_data(RESUME, "Jane Doe")
+    assert pdf_bytes.startswith(b"%PDF")
+    assert (filename, mime_type) == ("Jane_Doe_Resume.pdf", "application/pdf")
+
+    assert get_pdf_download_data(dict(RESUME), "Jane Doe")[0] == pdf_bytes
+    assert len(calls) == 1
+
+    get_pdf_download_data({**RESUME, "summary": "Changed"}, "Jane Doe")
+    assert len(calls) == 2
+
+
+def test_cache_evicts_by_size_and_spills_to_disk(tmp_path):
+    cache = PDFCache(max_bytes=10, spill_dir=str(tmp_path))
+    cache.set("a", b"123456")
+    cache.set("b", b"7890ab")
+    assert cache.size == 6
+    assert (tmp_path / "a.pdf").read_bytes() == b"123456"
+    assert cache.get("a") == b"123456"
+
+
+def test_style_registry_is_shared_and_read_only():
+    styles = get_styles()
+    assert get_styles() is styles
+    assert styles["SectionHeader"].fontSize == 14
+    try:
+        styles["SectionHeader"] = None
+        assert False, "style registry should be read-only"
+    except TypeError:
+        pass
+
+
+def _ms_per_render(renders=20):
+    generate_resume_pdf(RESUME, "Jane Doe")  # warm-up (font loading etc.)
+    start = time.perf_counter()
+    for _ in range(renders):
+        generate_resume_pdf(RESUME, "Jane Doe")
+    return (time.perf_counter() - start) / renders * 1000
+
+
+def test_render_time_with_and_without_style_registry(monkeypatch):
+    """Benchmark: per-render time with the shared registry vs. rebuilding the stylesheet each time."""
+    with_registry = _ms_per_render()
+    monkeypatch.setattr(pdf_generator, "get_styles", lambda theme="default", scale=1.0: create_custom_styles(theme))
+    without_registry = _ms_per_render()
+
+    print(f"\nPDF render: {with_registry:.2f} ms with style registry, {without_registry:.2f} ms rebuilding styles")
+    assert with_registry > 0 and without_registry > 0
+
+
+def test_batch_export_streams_every_resume_into_zip(tmp_path):
+    import zipfile
+    from services.pdf_generator import export_resumes_zip
+
+    items = [RESUME, (RESUME, "Ann Lee"), ({**RESUME, "summary": "Other"}, "Bo Chen")] * 2
+    zip_path = tmp_path / "cohort.zip"
+    result = export_resumes_zip(items, str(zip_path), max_workers=2)
+
+    assert result["exported"] == 6 and result["failed"] == []
+    with zipfile.ZipFile(zip_path) as archive:
+        names = archive.namelist()
+        assert names[0].endswith("_Resume.pdf") and len(names) == 6
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+    print(f"\nBatch export: {result['resumes_per_sec']} resumes/sec with 2 workers")
+
+
+def _page_count(pdf_bytes):
+    import re
+    return len(re.findall(rb"/Type /Page[^s]", pdf_bytes))
+
+
+def test_fit_to_page_shrinks_long_resume_to_one_page(monkeypatch):
+    long_resume = {**RESUME, "projects": [f"Project {i}: built and shipped a service handling millions of requests per day" for i in range(45)]}
+    assert _page_count(generate_resume_pdf(long_resume, "Jane Doe")) == 2
+
+    builds = []
+    real_build = pdf_generator.SimpleDocTemplate.build
+    monkeypatch.setattr(pdf_generator.SimpleDocTemplate, "build", lambda self, story: builds.append(1) or real_build(self, story))
+
+    scale = pdf_generator.fit_scale(normalize_resume(long_resume, "Jane Doe"))
+    assert pdf_generator.FIT_MIN_SCALE < scale < 1.0
+    assert _page_count(generate_resume_pdf(long_resume, "Jane Doe", fit_to_page=True)) == 1
+    # The search measures with wrap(); only the final render builds the document
+    assert len(builds) == 1
+    # Short resumes are left at full size
+    assert pdf_generator.fit_scale(normalize_resume(RESUME, "Jane Doe")) == 1.0
+    # Resumes that overflow even at FIT_MIN_SCALE keep full size
+    huge_resume = {**RESUME, "projects": long_resume["projects"] * 4}
+    assert pdf_generator.fit_scale(normalize_resume(huge_resume, "Jane Doe")) == 1.0
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+
+from conftest import CountingCollection
+from core import database
+from core.database import ConnectionManager, Database
+
+
+class CountingDatabase(Database):
+    @property
+    def users(self):
+        return self.counting_users
+
+
+@pytest.fixture
+def db(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(database, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(database, "PROFILE_CACHE_TTL_SECONDS", 30)
+    db = CountingDatabase(ConnectionManager("mongodb://test", "app", client_factory=lambda uri, **options: mongomock.MongoClient()))
+    db.counting_users = CountingCollection(db.db.users)
+    db.db.users.insert_one({"email": "a@b.c", "password": "hash", "profile": {"phone": "123"}})
+    db.clock = clock
+    return db
+
+
+def test_profile_is_read_once_per_ttl_without_the_password(db):
+    for _ in range(5):
+        assert db.get_user_profile("a@b.c") == {"phone": "123"}
+    assert db.users.projections == [{"profile": 1, "_id": 0}]
+
+    db.clock.now += 31
+    assert db.get_user_profile("a@b.c") == {"phone": "123"}
+    assert len(db.users.projections) == 2
+
+
+def test_update_invalidates_and_callers_cannot_mutate_the_cache(db):
+    profile = db.get_user_profile("a@b.c")
+    profile["phone"] = "changed locally"
+    assert db.get_user_profile("a@b.c") == {"phone": "123"}
+
+    db.update_user_profile("a@b.c", {"phone": "456"})
+    assert db.get_user_profile("a@b.c") == {"phone": "456"}
+    assert db.get_user_profile("a@b.c") == {"phone": "456"}
+    assert len(db.users.projections) == 2
+
+    db.invalidate_profile("a@b.c")
+    db.get_user_profile("a@b.c")
+    assert len(db.users.projections) == 3
+    # Unknown users are cached as empty profiles too
+    assert db.get_user_profile("nobody@b.c") == {}
@@ -0,0 +1,34 @@
+from agents.prompt_packing import estimate_tokens, get_packing_stats, pack_history, pack_inputs, pack_resume
+
+
+def test_resume_drops_empty_fields_and_is_key_order_independent():
+    resume = {
+        "contact": {"phone": "555", "email": None, "linkedin": None, "github": ""},
+        "skills": ["Python", "Go"],
+        "projects": [],
+        "summary": "Backend engineer",
+    }
+    text = pack_resume(resume)
+    assert text == "contact.phone: 555\nskills: Python; Go\nsummary: Backend engineer"
+    assert pack_resume(dict(reversed(list(resume.items())))) == text
+    assert pack_resume({"contact": {"email": None}}) == "(empty)"
+
+
+def test_history_keeps_newest_turns_within_budget():
+    history = [f"User: answer number {i} " + "x" * 40 for i in range(20)]
+    packed = pack_history(history, budget_tokens=60)
+    assert packed.startswith("[") and "earlier turns omitted" in packed
+    assert packed.endswith(history[-1])
+    assert "answer number 0 " not in packed
+    assert estimate_tokens(packed) <= 70
+    # The newest turn is always kept, even when it alone exceeds the budget
+    assert pack_history(["y" * 1000], budget_tokens=10) == "y" * 1000
+
+
+def test_pack_inputs_reports_savings():
+    resume = {"contact": {"phone": None, "email": None, "linkedin": None, "github": None, "address": None}, "skills": ["Python"]}
+    packed = pack_inputs("test_chain", {"job_description": "jd", "resume_data": resume, "history": []})
+    assert packed["job_description"] == "jd"
+    assert packed["resume_data"] == "skills: Python"
+    stats = get_packing_stats()["test_chain"]
+    assert stats["calls"] == 1 and stats["saved_per_call"] > 0
@@ -0,0 +1,62 @@
+import time
+
+from reportlab.lib.pagesizes import LETTER
+
+from services.pdf_generator import build_resume_story, get_styles, measure_story_height
+from services.resume_model import _normalize, normalize_resume
+from ui.components import _build_preview_html
+
+
+def make_resume(bullets):
+    return {
+        "contact": {"phone": "555-0100", "email": "jane@example.com", "address": "Pune\nIndia", "github": "github.com/jane"},
+        "summary": "Backend engineer focused on Python services.",
+        "experience_level": "fresher",
+        "projects": [f"Project {i}: shipped a service handling {i} million requests/day" for i in range(bullets)],
+        "skills": {"Languages": ["Python", "Go"], "Cloud": ["AWS", "Kubernetes"], "Misc": "Git"},
+        "education": "B.Tech Computer Science, 2020\nHigh School, 2016",
+        "achievements": [f"Award {i}" for i in range(max(2, bullets // 4))],
+    }
+
+
+def test_raw_notes_fallback_and_fresher_order():
+    resume = normalize_resume({"raw_notes": ["one", "two", "three"], "skills": ["Python"]}, "Jane")
+    assert [s.key for s in resume.sections] == ["summary", "skills", "experience"]
+    assert resume.sections[0].items == ("one two",)
+    assert resume.sections[2].items == ("three",)
+
+
+def test_model_is_memoized_on_content():
+    data = make_resume(3)
+    assert normalize_resume(data, "Jane") is normalize_resume(make_resume(3), "Jane")
+    assert normalize_resume(data, "Jane") is not normalize_resume(data, "Ann")
+
+
+def test_preview_and_pdf_render_the_same_sections():
+    resume = normalize_resume(make_resume(5), "Jane")
+    preview = _build_preview_html(resume)
+    story_text = " ".join(getattr(f, "text", "") for f in build_resume_story(resume, get_styles()))
+    for section in resume.sections:
+        assert section.title in preview
+        assert section.title.upper() in story_text
+
+
+def test_normalize_and_render_benchmark():
+    """Benchmark: normalize + preview HTML + PDF story layout for growing resume sizes."""
+    width = LETTER[0] - 72
+    print()
+    for label, bullets in (("small", 3), ("medium", 30), ("very large", 500)):
+        data = make_resume(bullets)
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            resume = _normalize(data, "Jane", "bench")
+        normalize_ms = (time.perf_counter() - start) / runs * 1000
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            _build_preview_html(resume)
+            measure_story_height(build_resume_story(resume, get_styles()), width)
+        render_ms = (time.perf_counter() - start) / runs * 1000
+        print(f"{label:>10} ({bullets} bullets): normalize {normalize_ms:.3f} ms, preview+PDF layout {render_ms:.2f} ms")
+        assert len(resume.sections) == 5
@@ -0,0 +1,38 @@
+from core.database import compute_resume_delta
+
+
+def test_appended_bullets_become_push():
+    old = {"projects": ["Built A"], "skills": ["Python"]}
+    new = {"projects": ["Built A", "Built B"], "skills": ["Python"]}
+    assert compute_resume_delta(old, new) == {
+        "$push": {"resume_data.projects": {"$each": ["Built B"]}}
+    }
+
+
+def test_changed_and_new_fields_are_set_and_removed_fields_unset():
+    old = {"summary": "Old", "contact": {"phone": None, "email": "a@b.c"}, "raw_notes": ["x"]}
+    new = {"summary": "New", "contact": {"phone": "123", "email": "a@b.c"}, "experience_level": "Junior"}
+    assert compute_resume_delta(old, new) == {
+        "$set": {
+            "resume_data.summary": "New",
+            "resume_data.contact.phone": "123",
+            "resume_data.experience_level": "Junior",
+        },
+        "$unset": {"resume_data.raw_notes": ""},
+    }
+
+
+def test_rewritten_list_and_unsafe_keys_replace_whole_value():
+    old = {"projects": ["A", "B"], "skills": {"Languages": ["Python"]}}
+    new = {"projects": ["A (refined)", "B"], "skills": {"Languages": ["Python"], "Node.js": ["Express"]}}
+    assert compute_resume_delta(old, new) == {
+        "$set": {
+            "resume_data.projects": ["A (refined)", "B"],
+            "resume_data.skills": {"Languages": ["Python"], "Node.js": ["Express"]},
+        }
+    }
+
+
+def test_no_changes_means_no_update():
+    data = {"projects": ["A"]}
+    assert compute_resume_delta(data, {"projects": ["A"]}) == {}
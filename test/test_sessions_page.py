@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from core.database import SESSION_PREVIEW_CHARS, ConnectionManager, Database
+
+
+class PreviewProjectionCollection:
+    """mongomock cannot evaluate the $substrCP preview projection; fetch the field and cut it here."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def find(self, query, projection):
+        substr = projection["job_description"]["$substrCP"]
+        cursor = self.collection.find(query, {**projection, "job_description": 1})
+        return PreviewCursor(cursor, substr[1], substr[2])
+
+
+class PreviewCursor:
+    def __init__(self, cursor, start, length):
+        self.cursor, self.start, self.length = cursor, start, length
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def limit(self, n):
+        self.cursor = self.cursor.limit(n)
+        return self
+
+    def __iter__(self):
+        for doc in self.cursor:
+            doc["job_description"] = doc["job_description"][self.start:self.start + self.length]
+            yield doc
+
+
+class PagedDatabase(Database):
+    @property
+    def sessions(self):
+        return PreviewProjectionCollection(self.db.sessions)
+
+
+@pytest.fixture
+def db():
+    manager = ConnectionManager("mongodb://test", "app", client_factory=lambda uri, **options: mongomock.MongoClient())
+    return PagedDatabase(manager)
+
+
+def test_pages_cover_every_session_once_including_legacy_ones(db):
+    start = datetime(2024, 1, 1)
+    sessions = db.db.sessions
+    # Two sessions share a timestamp so the _id tiebreak is exercised, plus legacy sessions without one
+    stamps = [start + timedelta(days=i // 2) for i in range(9)] + [None] * 4
+    for i, created_at in enumerate(stamps):
+        doc = {"email": "a@b.c", "job_description": f"Role {i} " + "x" * 300}
+        if created_at is not None:
+            doc["created_at"] = created_at
+        sessions.insert_one(doc)
+    sessions.insert_one({"email": "other@b.c", "job_description": "Not mine", "created_at": start})
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = db.get_user_sessions_page("a@b.c", limit=3, cursor=cursor)
+        seen += page
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 5
+    ids = [doc["_id"] for doc in seen]
+    assert len(ids) == len(set(ids)) == len(stamps)
+    # Newest first, legacy sessions last
+    dated = [doc["created_at"] for doc in seen if doc.get("created_at")]
+    assert dated == sorted(dated, reverse=True) and len(dated) == 9
+    assert all("created_at" not in doc for doc in seen[9:])
+    assert all(len(doc["job_description"]) <= SESSION_PREVIEW_CHARS for doc in seen)
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agents import agents
+from agents.agents import ATSScore, _structured_validator, get_parse_stats
+
+VALID = ATSScore(score=72, feedback=["Add metrics"], missing_keywords=["kafka"])
+
+
+def result(parsed, content="Sure! Here is the JSON: {...}"):
+    return {"raw": AIMessage(content=content), "parsed": parsed, "parsing_error": None if parsed else ValueError("bad json")}
+
+
+def test_valid_output_needs_no_repair(monkeypatch):
+    monkeypatch.setattr(agents, "parse_stats", {})
+    repair_calls = []
+    validator = _structured_validator("ats", RunnableLambda(lambda inputs: repair_calls.append(inputs)))
+    assert validator.invoke(result(VALID)) == VALID.model_dump()
+    assert not repair_calls
+    assert get_parse_stats()["ats"]["failure_rate"] == 0.0
+
+
+def test_one_repair_pass_then_raise(monkeypatch):
+    monkeypatch.setattr(agents, "parse_stats", {})
+    repair_calls = []
+
+    def repair(inputs):
+        repair_calls.append(inputs)
+        return result(VALID if len(repair_calls) == 1 else None)
+
+    validator = _structured_validator("ats", RunnableLambda(repair))
+    assert validator.invoke(result(None)) == VALID.model_dump()
+    assert repair_calls[0] == {"raw": "Sure! Here is the JSON: {...}", "error": "bad json"}
+
+    with pytest.raises(OutputParserException):
+        asyncio.run(validator.ainvoke(result(None)))
+    assert len(repair_calls) == 2
+
+    stats = get_parse_stats()["ats"]
+    assert stats == {"calls": 2, "parse_failures": 2, "repaired": 1, "unrecovered": 1, "failure_rate": 1.0}
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+from agents import summary_queue as sq
+from agents.summary_queue import SummaryQueue, merge_generated_summary, should_regenerate, summary_sources
+
+RESUME = {"projects": ["Queue", "Cache"], "skills": ["Python", "Go"], "education": "B.Tech"}
+
+
+def test_regeneration_policy():
+    assert not should_regenerate({"skills": ["Python"]}, None)
+    assert should_regenerate(RESUME, None)
+
+    generated = {"text": "Auto summary", "sources": summary_sources(RESUME)}
+    resume = {**RESUME, "summary": "Auto summary"}
+    assert not should_regenerate(resume, generated)
+    assert not should_regenerate({**resume, "projects": RESUME["projects"] + ["CLI"]}, generated)
+    assert should_regenerate({**resume, "projects": RESUME["projects"] + ["CLI", "API"]}, generated)
+    assert should_regenerate({**resume, "experience": ["Intern at Acme"]}, generated)
+    # A summary the user wrote is never replaced
+    assert not should_regenerate({**RESUME, "summary": "My own words", "experience": ["Intern"]}, generated)
+
+
+def test_merge_keeps_user_written_summaries():
+    generated = {"text": "New auto", "replaces": "Old auto"}
+    resume = {"summary": "Old auto"}
+    assert merge_generated_summary(resume, generated) and resume["summary"] == "New auto"
+    assert not merge_generated_summary(resume, generated)
+
+    resume = {"summary": "My own words"}
+    assert not merge_generated_summary(resume, generated) and resume["summary"] == "My own words"
+    resume = {}
+    assert merge_generated_summary(resume, generated) and resume["summary"] == "New auto"
+
+
+def test_queue_runs_one_job_per_session_and_keeps_the_latest(monkeypatch):
+    release = threading.Event()
+    prompts = []
+
+    async def fake_summary(job_description, resume_data):
+        prompts.append(len(resume_data["projects"]))
+        await asyncio.to_thread(release.wait, 5)
+        return f"Summary of {len(resume_data['projects'])} projects"
+
+    monkeypatch.setattr(sq, "agenerate_resume_summary", fake_summary)
+    saved = []
+    queue = SummaryQueue(save=lambda session_id, generated: saved.append((session_id, generated)))
+
+    queue.submit("s1", "jd", RESUME)
+    queue.submit("s1", "jd", {**RESUME, "projects": ["A", "B", "C"]})
+    queue.submit("s1", "jd", {**RESUME, "projects": ["A", "B", "C", "D"]})
+    assert queue.is_pending("s1")
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while queue.is_pending("s1") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not queue.is_pending("s1")
+    # The middle request was superseded before it started
+    assert prompts == [2, 4]
+    assert [g["text"] for _, g in saved] == ["Summary of 2 projects", "Summary of 4 projects"]
+    assert saved[1][1]["replaces"] == "Summary of 2 projects"
+    assert saved[1][1]["sources"]["projects"] == 4